@@ -0,0 +1,174 @@
+"""Grouped and filtered Equipment queries with and without the model indexes.
+
+Loads synthetic rows (1M by default) straight into an on-disk SQLite test
+database, times each query with the indexes declared on Equipment.Meta
+dropped, then builds them and times the queries again. Timings (median of
+--repeat runs) and SQLite query plans are written as JSON.
+
+    cd backend
+    python -m benchmarks.bench_indexes --rows 1m
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.run_benchmarks import BENCH_DIR, git_commit, setup_django
+
+INSERT_FIELDS = ["dataset_id", "equipment_id", "name", "type", "status", "location",
+                 "purchase_year", "condition"]
+
+
+def build_queries():
+    """name -> function of a dataset id returning the queryset to evaluate."""
+    from django.db.models import Count
+
+    from equipment.models import Equipment
+
+    def rows(dataset_id):
+        return Equipment.objects.filter(dataset_id=dataset_id)
+
+    return {
+        "count_by_type": lambda ds: rows(ds).values("type").annotate(n=Count("id")).order_by(),
+        "count_by_type_status": lambda ds: (
+            rows(ds).values("type", "status").annotate(n=Count("id")).order_by()
+        ),
+        "type_and_status_lookup": lambda ds: (
+            rows(ds).filter(type="Pump", status="Maintenance").values_list("equipment_id", flat=True)
+        ),
+        "count_by_type_at_location": lambda ds: (
+            rows(ds).filter(location="Tank Farm").values("type").annotate(n=Count("id")).order_by()
+        ),
+        "status_filter": lambda ds: rows(ds).filter(status="Retired").values_list("pk", flat=True),
+        "purchase_year_range": lambda ds: (
+            rows(ds).filter(purchase_year__gte=2024).values("status").annotate(n=Count("id")).order_by()
+        ),
+    }
+
+
+def load_rows(rows, seed=42):
+    """Insert ``rows`` generated rows into a new Dataset with raw executemany."""
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from benchmarks.generate_data import CHUNK_ROWS, generate_chunk
+    from equipment.models import Dataset, Equipment
+
+    rng = np.random.default_rng(seed)
+    columns = ", ".join(f'"{field}"' for field in INSERT_FIELDS)
+    placeholders = ", ".join(["%s"] * len(INSERT_FIELDS))
+    sql = f'INSERT INTO "{Equipment._meta.db_table}" ({columns}) VALUES ({placeholders})'
+    with transaction.atomic(), connection.cursor() as cursor:
+        dataset = Dataset.objects.create(
+            name=f"index benchmark ({rows} rows)", row_count=rows, published_at=timezone.now()
+        )
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = generate_chunk(rng, start, min(CHUNK_ROWS, rows - start))
+            cursor.executemany(sql, zip(
+                [dataset.pk] * len(chunk),
+                chunk["equipment_id"].tolist(),
+                chunk["equipment_name"].tolist(),
+                chunk["equipment_type"].tolist(),
+                chunk["status"].tolist(),
+                chunk["location"].tolist(),
+                chunk["purchase_year"].tolist(),
+                chunk["condition"].tolist(),
+            ))
+    return dataset
+
+
+def set_indexes(enabled):
+    """Create (or drop) every index declared on Equipment.Meta; returns seconds taken."""
+    from django.db import connection
+
+    from equipment.models import Equipment
+
+    started = time.perf_counter()
+    with connection.schema_editor() as editor:
+        for index in Equipment._meta.indexes:
+            if enabled:
+                editor.add_index(Equipment, index)
+            else:
+                editor.remove_index(Equipment, index)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return time.perf_counter() - started
+
+
+def time_queries(queries, dataset_id, repeat):
+    results = {}
+    for name, build in queries.items():
+        queryset = build(dataset_id)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append(time.perf_counter() - started)
+        results[name] = {
+            "median_seconds": round(statistics.median(timings), 5),
+            "plan": queryset.explain(),
+        }
+    return results
+
+
+def main():
+    from benchmarks.generate_data import parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1m", help="row count (10k, 100k, 1m, 10m or an integer)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query (median is reported)")
+    parser.add_argument("--db-file", help="SQLite test database (default: a temporary file)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/indexes-<commit>.json)")
+    args = parser.parse_args()
+
+    rows = parse_size(args.rows)
+    db_file = args.db_file or os.path.join(tempfile.mkdtemp(), "bench_indexes.sqlite3")
+    setup_django(db_file)
+    queries = build_queries()
+
+    set_indexes(False)
+    started = time.perf_counter()
+    dataset = load_rows(rows)
+    print(f"Loaded {rows:,} rows in {time.perf_counter() - started:.1f}s")
+
+    without = time_queries(queries, dataset.pk, args.repeat)
+    build_seconds = set_indexes(True)
+    print(f"Built indexes in {build_seconds:.1f}s")
+    with_indexes = time_queries(queries, dataset.pk, args.repeat)
+
+    print(f"{'query':>28} {'no indexes':>12} {'indexes':>12} {'speedup':>8}")
+    results = []
+    for name in queries:
+        before, after = without[name]["median_seconds"], with_indexes[name]["median_seconds"]
+        speedup = round(before / after, 1) if after else None
+        print(f"{name:>28} {before:>11.4f}s {after:>11.4f}s {speedup:>7}x")
+        results.append({
+            "query": name,
+            "rows": rows,
+            "without_indexes": without[name],
+            "with_indexes": with_indexes[name],
+            "speedup": speedup,
+        })
+
+    commit = git_commit()
+    output = args.output or os.path.join(
+        BENCH_DIR, "results", f"indexes-{(commit or 'unknown')[:12]}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "index_build_seconds": round(build_seconds, 3),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Synthetic equipment CSV generator for the benchmarks.
+
+Writes every column the upload endpoint requires plus the process variables
+(flowrate, pressure, temperature), with skewed, plant-like distributions of
+type, location, status, condition and purchase year.
+
+    python benchmarks/generate_data.py --sizes 10k,100k,1m,10m --out-dir benchmarks/data
+"""
+import argparse
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+TYPES = {
+    # type: (share, flowrate mean, pressure mean, temperature mean)
+    "Valve": (0.30, 110, 3.5, 60),
+    "Pump": (0.25, 120, 4.0, 55),
+    "Heat Exchanger": (0.12, 180, 6.0, 110),
+    "Compressor": (0.10, 90, 9.0, 105),
+    "Reactor": (0.08, 150, 10.0, 150),
+    "Separator": (0.07, 130, 2.5, 50),
+    "Mixer": (0.05, 115, 3.0, 65),
+    "Distillation Column": (0.03, 175, 1.8, 85),
+}
+LOCATIONS = {
+    "Unit A": 0.22, "Unit B": 0.20, "Unit C": 0.16, "Unit D": 0.12,
+    "Unit E": 0.10, "Unit F": 0.08, "Tank Farm": 0.07, "Utilities": 0.05,
+}
+STATUSES = {"Active": 0.78, "Idle": 0.10, "Maintenance": 0.09, "Retired": 0.03}
+CONDITIONS = ["Excellent", "Good", "Fair", "Poor"]
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+CHUNK_ROWS = 500_000
+
+
+def parse_size(value):
+    value = value.strip().lower()
+    return SIZES.get(value) or int(value)
+
+
+def _choice(rng, options, n):
+    labels = list(options)
+    shares = np.array(list(options.values()), dtype=float)
+    return rng.choice(labels, size=n, p=shares / shares.sum())
+
+
+def generate_chunk(rng, start, n, this_year=None):
+    """``n`` synthetic rows with equipment ids starting at ``start + 1``."""
+    this_year = this_year or date.today().year
+    type_names = list(TYPES)
+    profile = np.array([TYPES[name][1:] for name in type_names])
+    shares = np.array([TYPES[name][0] for name in type_names])
+    type_idx = rng.choice(len(type_names), size=n, p=shares / shares.sum())
+    types = np.array(type_names)[type_idx]
+
+    # Fleet skews young: most equipment was bought in the last 15 years
+    age = np.minimum(rng.gamma(2.0, 5.0, size=n).astype(int), this_year - 1975)
+    purchase_year = this_year - age
+    wear = np.clip(age / 40 + rng.normal(0, 0.15, size=n), 0, 0.999)
+    condition = np.array(CONDITIONS)[(wear * len(CONDITIONS)).astype(int)]
+
+    flow, pressure, temperature = profile[type_idx].T
+    ids = np.arange(start + 1, start + n + 1)
+    return pd.DataFrame({
+        "equipment_id": ids,
+        "equipment_name": pd.Series(types).str.replace(" ", "-") + "-" + pd.Series(ids).astype(str),
+        "equipment_type": types,
+        "status": _choice(rng, STATUSES, n),
+        "location": _choice(rng, LOCATIONS, n),
+        "purchase_year": purchase_year,
+        "condition": condition,
+        "flowrate": np.round(rng.normal(flow, flow * 0.15), 1),
+        "pressure": np.round(np.abs(rng.normal(pressure, pressure * 0.2)), 2),
+        "temperature": np.round(rng.normal(temperature, temperature * 0.1), 1),
+    })
+
+
+def generate_csv(path, rows, seed=42):
+    """Write ``rows`` synthetic rows to ``path`` in bounded-memory chunks."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="") as out:
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = generate_chunk(rng, start, min(CHUNK_ROWS, rows - start))
+            chunk.to_csv(out, header=start == 0, index=False)
+    return path
+
+
+def dataset_path(out_dir, rows):
+    return os.path.join(out_dir, f"equipment_{rows}.csv")
+
+
+def ensure_dataset(out_dir, rows, seed=42):
+    """Path of the generated file for ``rows``, generating it on first use."""
+    path = dataset_path(out_dir, rows)
+    if not os.path.exists(path):
+        generate_csv(path, rows, seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k,100k,1m,10m",
+                        help="comma-separated row counts (10k, 100k, 1m, 10m or integers)")
+    parser.add_argument("--out-dir", default=os.path.join(os.path.dirname(__file__), "data"))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for size in args.sizes.split(","):
+        rows = parse_size(size)
+        path = generate_csv(dataset_path(args.out_dir, rows), rows, args.seed)
+        print(f"{rows:>10,} rows -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Benchmark harness for the upload, summary and PDF report endpoints.
+
+Drives each endpoint through the Django test client against a throwaway
+test database and records wall time, rows/s, query count and peak memory.
+Results are written as JSON so runs can be compared across commits.
+
+    cd backend
+    python -m benchmarks.run_benchmarks --sizes 10k,100k
+    python -m benchmarks.run_benchmarks --sizes 1m,10m --db-file /tmp/bench.sqlite3
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(BACKEND_DIR, "benchmarks")
+
+# Most queries each read endpoint may run on a cache miss; the run fails
+# if one needs more (e.g. a summary that stops being a single statement)
+QUERY_BUDGETS = {
+    "summary": 1,
+    "summary_filtered": 1,
+    "pdf_report": 1,
+}
+
+
+def setup_django(db_file=None):
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "chemical_backend.settings")
+    import django
+    from django.conf import settings
+
+    if db_file:
+        settings.DATABASES["default"]["TEST"] = {"NAME": db_file}
+    # Snapshots, reports and charts are named by dataset id, and the test
+    # database reuses the ids of real datasets: keep them (and the response
+    # cache) apart from the real MEDIA_ROOT and cache
+    settings.MEDIA_ROOT = tempfile.mkdtemp(prefix="equipment-bench-")
+    atexit.register(shutil.rmtree, settings.MEDIA_ROOT, ignore_errors=True)
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def current_rss():
+    """Resident set size in bytes (Linux /proc; falls back to the peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakMemory:
+    """Sample RSS on a background thread; cheap enough not to skew wall time.
+
+    tracemalloc gives exact Python-level peaks but slows allocation-heavy
+    code several times over, so it is only used with --tracemalloc.
+    """
+
+    def __init__(self, use_tracemalloc=False, interval=0.005):
+        self.use_tracemalloc = use_tracemalloc
+        self.interval = interval
+        self.peak = self.baseline = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+    def __enter__(self):
+        self.baseline = self.peak = current_rss()
+        if self.use_tracemalloc:
+            tracemalloc.start()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+        if self.use_tracemalloc:
+            self.python_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+
+def measure(name, rows, call, use_tracemalloc=False):
+    """Run ``call()`` once, recording wall time, queries and peak memory."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with PeakMemory(use_tracemalloc) as memory, CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = call()
+        if getattr(response, "streaming", False):
+            for _ in response.streaming_content:
+                pass
+        elapsed = time.perf_counter() - started
+
+    result = {
+        "endpoint": name,
+        "rows": rows,
+        "status": response.status_code,
+        "wall_seconds": round(elapsed, 4),
+        "rows_per_second": round(rows / elapsed) if elapsed else None,
+        "queries": len(queries),
+        "peak_rss_mb": round(memory.peak / 2**20, 1),
+        "peak_rss_growth_mb": round((memory.peak - memory.baseline) / 2**20, 1),
+    }
+    if use_tracemalloc:
+        result["peak_python_memory_mb"] = round(memory.python_peak / 2**20, 2)
+    if name in QUERY_BUDGETS:
+        result["query_budget"] = QUERY_BUDGETS[name]
+        result["within_query_budget"] = len(queries) <= QUERY_BUDGETS[name]
+    return result
+
+
+def bench_size(client, path, rows, use_tracemalloc=False):
+    results = []
+    with open(path, "rb") as file:
+        results.append(measure(
+            "upload", rows,
+            lambda: client.post("/api/upload/", {"file": file, "wait": "true"}),
+            use_tracemalloc,
+        ))
+    results.append(measure("summary", rows, lambda: client.get("/api/summary/"), use_tracemalloc))
+    results.append(measure(
+        "summary_filtered", rows,
+        lambda: client.get("/api/summary/", {"status": "Active,Idle", "purchase_year_min": 2010}),
+        use_tracemalloc,
+    ))
+    results.append(measure("pdf_report", rows, lambda: client.get("/api/report/pdf/"), use_tracemalloc))
+    results.append(measure(
+        "pdf_report_full", rows, lambda: client.get("/api/report/pdf/", {"mode": "full"}), use_tracemalloc
+    ))
+    return results
+
+
+def main():
+    from benchmarks.generate_data import ensure_dataset, parse_size
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k,100k",
+                        help="comma-separated row counts (10k, 100k, 1m, 10m or integers)")
+    parser.add_argument("--data-dir", default=os.path.join(BENCH_DIR, "data"))
+    parser.add_argument("--db-file", help="on-disk SQLite test database (default: in memory)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="also record exact Python allocation peaks (slows timings)")
+    args = parser.parse_args()
+
+    setup_django(args.db_file)
+    from django.test import Client
+
+    client = Client()
+    commit = git_commit()
+    results = []
+    for size in args.sizes.split(","):
+        rows = parse_size(size)
+        path = ensure_dataset(args.data_dir, rows)
+        for result in bench_size(client, path, rows, args.tracemalloc):
+            print(f"{result['endpoint']:>16} {rows:>10,} rows  {result['wall_seconds']:>9.3f}s  "
+                  f"{result['queries']:>5} queries  {result['peak_rss_mb']:>8.1f} MB peak RSS")
+            results.append(result)
+
+    output = args.output or os.path.join(BENCH_DIR, "results", f"{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    over_budget = [result for result in results if result.get("within_query_budget") is False]
+    for result in over_budget:
+        print(f"{result['endpoint']} ran {result['queries']} queries "
+              f"(budget {result['query_budget']})", file=sys.stderr)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from importlib.util import find_spec
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -52,6 +53,14 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL lets job progress polls read while an ingest job is writing
+            'init_command': 'PRAGMA journal_mode=WAL;',
+            # Take the write lock when a transaction starts, so concurrent
+            # writers wait on the busy timeout instead of failing at once
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -64,4 +73,66 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# File-based so every server process sees the same data version and responses
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+    }
+}
+
 CORS_ALLOW_ALL_ORIGINS = True  # dev only
+
+# Rows per bulk_create batch when ingesting uploads
+EQUIPMENT_INGEST_BATCH_SIZE = 5000
+
+# Rows parsed per chunk when streaming uploads (bounds peak memory)
+EQUIPMENT_INGEST_CHUNK_SIZE = 50000
+
+# Threads in the local ingest worker pool (uploads run as background jobs)
+EQUIPMENT_INGEST_WORKERS = 1
+
+# Seconds a queued or running job may go without progress before it is
+# taken for lost (its server stopped) and marked failed
+EQUIPMENT_JOB_HEARTBEAT_TIMEOUT = 600
+
+# Rejected rows listed (with reasons) in an upload response; the rest are only counted
+EQUIPMENT_MAX_REJECTED_REPORT = 1000
+
+# Number of uploaded datasets to keep for /api/history/ (None keeps all)
+EQUIPMENT_DATASET_RETENTION = None
+
+# Worker processes for parsing multi-file / ZIP uploads (None = all cores)
+EQUIPMENT_PARSE_PROCESSES = None
+
+# Write a Parquet snapshot of every ingested dataset under MEDIA_ROOT/snapshots
+EQUIPMENT_SNAPSHOTS = True
+
+# Seconds a rendered API response is cached for one data version
+EQUIPMENT_RESPONSE_CACHE_TIMEOUT = 3600
+
+# Render each dataset's PDF report (MEDIA_ROOT/reports) as soon as it is ingested
+EQUIPMENT_PRERENDER_REPORTS = True
+
+# Embed type and pressure/temperature charts in the PDF reports (needs matplotlib)
+EQUIPMENT_REPORT_CHARTS = True
+
+# Most chart images kept under MEDIA_ROOT/charts (least recently used go first)
+EQUIPMENT_CHART_CACHE_SIZE = 200
+
+# Equipment rows fetched per query (and per Parquet row group) by /api/export/
+EQUIPMENT_EXPORT_CHUNK_SIZE = 10000
+
+# Equipment rows fetched per query while drawing the full (?mode=full) PDF report
+EQUIPMENT_REPORT_CHUNK_SIZE = 2000
+
+# API renderers, chosen by the Accept header: orjson-backed JSON, plus
+# MessagePack and Arrow IPC streams when their libraries are installed
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'equipment.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        *(['equipment.renderers.MessagePackRenderer'] if find_spec('msgpack') else []),
+        *(['equipment.renderers.ArrowIPCRenderer'] if find_spec('pyarrow') else []),
+    ],
+}
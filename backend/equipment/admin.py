@@ -1,10 +1,22 @@
 # backend/equipment/admin.py
 from django.contrib import admin
-from .models import Equipment
+from .models import Dataset, Equipment, IngestJob
+
+@admin.register(Dataset)
+class DatasetAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'name',
+        'row_count',
+        'created_at',
+        'updated_at'
+    )
+
 
 @admin.register(Equipment)
 class EquipmentAdmin(admin.ModelAdmin):
     list_display = (
+        'dataset',
         'equipment_id',
         'name',
         'type',
@@ -13,3 +25,16 @@ class EquipmentAdmin(admin.ModelAdmin):
         'purchase_year',
         'condition'
     )
+
+
+@admin.register(IngestJob)
+class IngestJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'file_name',
+        'mode',
+        'status',
+        'rows_processed',
+        'created_at',
+        'finished_at'
+    )
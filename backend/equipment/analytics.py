@@ -0,0 +1,201 @@
+# backend/equipment/analytics.py
+"""Single-pass, mergeable statistics over equipment data.
+
+Numeric columns keep a running count, mean and sum of squared deviations
+(Welford), plus min/max; text columns keep value counts. Chunks are folded
+in with Chan et al.'s pairwise update, so partial results from separate
+chunks, files or processes merge exactly as if the data had been read in
+one pass, and a file of any size is read once in constant memory.
+
+Nothing here touches Django: the desktop app imports it from the installed
+backend package (``pip install -e backend``).
+"""
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from .parsing import COLUMN_ALIASES, FIELD_NAMES, NUMERIC_FIELDS
+
+NUMERIC_COLUMNS = NUMERIC_FIELDS
+CATEGORY_COLUMNS = ("type", "status", "location", "condition")
+
+
+def canonical_column(header):
+    """Equipment field of a CSV header ("PRESSURE (BAR)", "equipment_type", ...).
+
+    Headers are matched exactly as ingest matches them (parsing.COLUMN_ALIASES).
+    """
+    column = COLUMN_ALIASES.get(header, header)
+    return FIELD_NAMES.get(column, column)
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of numbers."""
+
+    __slots__ = ("count", "mean", "m2", "min", "max")
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min=None, max=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    def push(self, value):
+        """Add one value (Welford's update); None and NaN are skipped."""
+        if value is None or value != value:
+            return self
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def update(self, values):
+        """Add an array of values in one vectorized step; NaNs are skipped."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self.merge(RunningStats(
+                len(values), float(mean), float(((values - mean) ** 2).sum()),
+                float(values.min()), float(values.max()),
+            ))
+        return self
+
+    def merge(self, other):
+        """Fold in the stats of other values (Chan et al.)."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (None below two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else None
+
+    @property
+    def std(self):
+        variance = self.variance
+        return math.sqrt(variance) if variance is not None else None
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "min": self.min, "max": self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of ``to_dict``; a ``{"count", "sum"}`` mapping (no variance) is accepted too."""
+        data = dict(data or {})
+        if "mean" not in data and data.get("count"):
+            data["mean"] = data["sum"] / data["count"]
+        return cls(**{key: data[key] for key in cls.__slots__ if key in data})
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.mean if self.count else None,
+            "std": self.std,
+            "min": self.min,
+            "max": self.max,
+        }
+
+
+class StreamStats:
+    """Stats of every numeric and category column of a stream of rows."""
+
+    def __init__(self, numeric=NUMERIC_COLUMNS, categories=CATEGORY_COLUMNS):
+        self.rows = 0
+        self.numeric = {column: RunningStats() for column in numeric}
+        self.categories = {column: Counter() for column in categories}
+
+    def update(self, frame):
+        """Add a DataFrame chunk; headers may use any of the known layouts."""
+        frame = frame.rename(columns=canonical_column)
+        self.rows += len(frame)
+        for column, stats in self.numeric.items():
+            if column in frame.columns:
+                stats.update(pd.to_numeric(frame[column], errors="coerce"))
+        for column, counts in self.categories.items():
+            if column in frame.columns:
+                for value, count in frame[column].value_counts().items():
+                    counts[str(value)] += int(count)
+        return self
+
+    def push(self, row):
+        """Add one row given as a mapping of header -> value."""
+        row = {canonical_column(key): value for key, value in row.items()}
+        self.rows += 1
+        for column, stats in self.numeric.items():
+            value = row.get(column)
+            try:
+                stats.push(float(value) if value not in (None, "") else None)
+            except (TypeError, ValueError):
+                pass
+        for column, counts in self.categories.items():
+            value = row.get(column)
+            if value not in (None, ""):
+                counts[str(value)] += 1
+        return self
+
+    def merge(self, other):
+        """Fold in the stats of another part of the data."""
+        self.rows += other.rows
+        for column, stats in other.numeric.items():
+            self.numeric.setdefault(column, RunningStats()).merge(stats)
+        for column, counts in other.categories.items():
+            self.categories.setdefault(column, Counter()).update(counts)
+        return self
+
+    def result(self):
+        return {
+            "rows": self.rows,
+            "numeric": {column: stats.summary() for column, stats in self.numeric.items()},
+            "categories": {
+                column: dict(counts.most_common()) for column, counts in self.categories.items()
+            },
+        }
+
+
+def analyze_chunks(chunks, **columns):
+    """One pass over an iterable of DataFrames."""
+    stats = StreamStats(**columns)
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def analyze_rows(rows, **columns):
+    """One pass over an iterable of row mappings (e.g. csv.DictReader)."""
+    stats = StreamStats(**columns)
+    for row in rows:
+        stats.push(row)
+    return stats
+
+
+def analyze_file(path, chunksize=100_000, **columns):
+    """One sequential read of a CSV file, ``chunksize`` rows in memory at a time.
+
+    Only the columns being analysed are parsed.
+    """
+    wanted = set(columns.get("numeric", NUMERIC_COLUMNS)) | set(columns.get("categories", CATEGORY_COLUMNS))
+    chunks = pd.read_csv(
+        path,
+        usecols=lambda header: canonical_column(header) in wanted,
+        chunksize=chunksize,
+    )
+    return analyze_chunks(chunks, **columns)
@@ -0,0 +1,81 @@
+# backend/equipment/caching.py
+"""Rendered API responses cached per data version.
+
+Every committed ingest bumps the data version, so nothing is ever
+invalidated explicitly: responses cached for an older version are simply
+never looked up again and expire after EQUIPMENT_RESPONSE_CACHE_TIMEOUT.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+DATA_VERSION_KEY = "equipment:data-version"
+
+
+def _clock():
+    return time.time_ns() // 1000
+
+
+def get_data_version():
+    """Current data version (an integer that only grows)."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # Lost (cleared or culled): restart from the clock, which is past
+        # every version handed out before, so stale entries stay unreachable
+        cache.add(DATA_VERSION_KEY, _clock(), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """Move to a new data version; call once the new data is committed."""
+    version = max(get_data_version() + 1, _clock())
+    cache.set(DATA_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def cached_response(request, namespace, render):
+    """Serve ``render()`` from the cache, answering conditional GETs with 304.
+
+    ``render`` returns ``(data, last_modified)`` - the response data and a
+    datetime or None - and only runs when this data version, query string
+    and media type have not been rendered before. The data is encoded with
+    the renderer negotiated for the request (JSON, MessagePack, Arrow...),
+    so each media type is cached on its own. Cache hits touch no database.
+    """
+    renderer, media_type = request.accepted_renderer, request.accepted_media_type
+    query = request.META.get("QUERY_STRING", "")
+    variant = hashlib.md5(f"{media_type}\n{query}".encode()).hexdigest()
+    key = f"equipment:{namespace}:{get_data_version()}:{variant}"
+    entry = cache.get(key)
+    if entry is None:
+        data, last_modified = render()
+        body = renderer.render(data, media_type, {"request": request})
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f"; charset={renderer.charset}"
+        entry = {
+            "body": body,
+            "content_type": content_type,
+            "etag": f'"{hashlib.md5(body).hexdigest()}"',
+            "last_modified": int(last_modified.timestamp()) if last_modified else None,
+        }
+        cache.set(key, entry, getattr(settings, "EQUIPMENT_RESPONSE_CACHE_TIMEOUT", 3600))
+
+    response = get_conditional_response(
+        request, etag=entry["etag"], last_modified=entry["last_modified"]
+    )
+    if response is None:
+        response = HttpResponse(entry["body"], content_type=entry["content_type"])
+    response["ETag"] = entry["etag"]
+    if entry["last_modified"] is not None:
+        response["Last-Modified"] = http_date(entry["last_modified"])
+    # Let clients keep the body but revalidate on every poll
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ["Accept"])
+    return response
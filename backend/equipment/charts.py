@@ -0,0 +1,175 @@
+# backend/equipment/charts.py
+"""Charts for the PDF reports, rendered with matplotlib's Agg backend.
+
+Each chart has one Figure that is cleared and redrawn for every render
+instead of being rebuilt (figure creation dominates the cost of a small
+chart). Figures are not thread-safe, so renders are serialized by a lock.
+Rendered PNGs are kept under MEDIA_ROOT/charts, keyed like the report
+files, so a chart is drawn once per dataset version. Filtered full reports
+add a chart per filter combination, so the least recently used files are
+evicted beyond EQUIPMENT_CHART_CACHE_SIZE.
+"""
+import glob
+import os
+import tempfile
+import threading
+from io import BytesIO
+
+import numpy as np
+from django.conf import settings
+
+from .histograms import histogram_2d
+
+try:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+except ImportError:  # reports are text-only without matplotlib
+    Figure = None
+
+# Bar colours of the desktop EquipmentChart, cycled for further types
+TYPE_COLORS = [
+    '#4dabf7', '#40c057', '#fab005', '#ff8787',
+    '#7950f2', '#ff922b', '#15aabf', '#e64980',
+    '#20c997', '#adb5bd',
+]
+
+# Size of the rendered charts (inches) and their resolution
+CHART_SIZE = (7.5, 4.2)
+CHART_DPI = 150
+
+# Bins of the pressure/temperature density plot on each axis
+DENSITY_BINS = 40
+
+_figures = {}
+_lock = threading.Lock()
+
+
+def charts_enabled():
+    return Figure is not None and getattr(settings, "EQUIPMENT_REPORT_CHARTS", True)
+
+
+def charts_dir():
+    return os.path.join(settings.MEDIA_ROOT, "charts")
+
+
+def get_chart_cache_size():
+    """Most chart files kept under MEDIA_ROOT/charts."""
+    return getattr(settings, "EQUIPMENT_CHART_CACHE_SIZE", 200)
+
+
+def _figure(name):
+    """The reusable figure of chart ``name``, cleared for a new render."""
+    figure = _figures.get(name)
+    if figure is None:
+        figure = Figure(figsize=CHART_SIZE, dpi=CHART_DPI, facecolor="white")
+        FigureCanvasAgg(figure)
+        _figures[name] = figure
+    figure.clear()
+    return figure
+
+
+def _png(figure):
+    buffer = BytesIO()
+    figure.savefig(buffer, format="png", facecolor="white")
+    return buffer.getvalue()
+
+
+def _style(ax):
+    ax.spines["top"].set_visible(False)
+    ax.spines["right"].set_visible(False)
+    ax.spines["left"].set_color("#e9ecef")
+    ax.spines["bottom"].set_color("#e9ecef")
+    ax.tick_params(colors="#495057", labelsize=8)
+
+
+def type_chart(type_counts):
+    """Horizontal bar chart of equipment counts per type, as PNG bytes."""
+    types = list(type_counts)[::-1]
+    counts = [type_counts[type_] for type_ in types]
+    with _lock:
+        figure = _figure("types")
+        ax = figure.add_subplot(111)
+        colors = [TYPE_COLORS[i % len(TYPE_COLORS)] for i in range(len(types))][::-1]
+        bars = ax.barh(range(len(types)), counts, color=colors, height=0.7)
+        ax.set_yticks(range(len(types)))
+        ax.set_yticklabels(types, fontsize=7 if len(types) > 20 else 9)
+        ax.bar_label(bars, padding=3, fontsize=7, color="#1a1e24")
+        ax.set_title("Equipment Type Distribution", fontsize=10, color="#1a1e24")
+        ax.xaxis.grid(True, linestyle="--", alpha=0.7, color="#e9ecef")
+        ax.set_axisbelow(True)
+        _style(ax)
+        figure.tight_layout()
+        return _png(figure)
+
+
+def density_chart(pressure, temperature):
+    """Pressure/temperature density plot (2D histogram) as PNG bytes, or None without data."""
+    bins = histogram_2d(pressure, temperature, "pressure", "temperature", bins=DENSITY_BINS)
+    if not bins["total"]:
+        return None
+    with _lock:
+        figure = _figure("density")
+        ax = figure.add_subplot(111)
+        # counts are indexed [x bin][y bin]; pcolormesh wants rows of y
+        mesh = ax.pcolormesh(
+            bins["x_edges"], bins["y_edges"], np.asarray(bins["counts"]).T, cmap="Reds", shading="flat"
+        )
+        figure.colorbar(mesh, ax=ax, label="Equipment")
+        ax.set_xlabel("Pressure (bar)", fontsize=9, color="#495057")
+        ax.set_ylabel("Temperature (°C)", fontsize=9, color="#495057")
+        ax.set_title("Pressure / Temperature Density", fontsize=10, color="#1a1e24")
+        _style(ax)
+        figure.tight_layout()
+        return _png(figure)
+
+
+def cached_chart(key, name, render):
+    """Path of chart ``name`` for cache ``key``, calling ``render()`` for its
+    PNG bytes only the first time (None if it has nothing to show)."""
+    path = os.path.join(charts_dir(), f"{key}-{name}.png")
+    try:
+        # Mark as recently used
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+    png = render()
+    if png is None:
+        return None
+    os.makedirs(charts_dir(), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=charts_dir(), suffix=".tmp")
+    with os.fdopen(fd, "wb") as file:
+        file.write(png)
+    os.replace(tmp_path, path)
+    evict_charts()
+    return path
+
+
+def _last_used(path):
+    try:
+        return os.path.getmtime(path)
+    except FileNotFoundError:
+        return 0
+
+
+def evict_charts():
+    """Remove the least recently used charts beyond EQUIPMENT_CHART_CACHE_SIZE."""
+    paths = glob.glob(os.path.join(charts_dir(), "*.png"))
+    excess = len(paths) - get_chart_cache_size()
+    if excess <= 0:
+        return
+    for path in sorted(paths, key=_last_used)[:excess]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def delete_charts(dataset_id, keep=None):
+    """Remove the cached charts of a dataset (except those whose key starts with ``keep``)."""
+    for path in glob.glob(os.path.join(charts_dir(), f"dataset-{dataset_id}-*.png")):
+        if keep is None or not os.path.basename(path).startswith(keep):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,53 @@
+# backend/equipment/cube.py
+"""Pivot ("cube") aggregation of Equipment rows in one GROUP BY."""
+from django.db.models import Avg, Count, Max, Min, Sum
+
+from .parsing import NUMERIC_FIELDS
+
+# Columns a cube can be broken down by
+DIMENSIONS = ("type", "status", "location", "condition", "purchase_year")
+
+AGGREGATES = {"avg": Avg, "min": Min, "max": Max, "sum": Sum}
+
+
+def parse_measure(text):
+    """``"count"`` or ``"<avg|min|max|sum>:<numeric field>"`` -> (column name, aggregate).
+
+    Raises ValueError for anything else.
+    """
+    if text == "count":
+        return "count", Count("id")
+    function, _, field = text.partition(":")
+    if function not in AGGREGATES or field not in NUMERIC_FIELDS:
+        raise ValueError(
+            f"Unknown measure '{text}'. Use count or "
+            f"<{'|'.join(AGGREGATES)}>:<{'|'.join(NUMERIC_FIELDS)}>"
+        )
+    return f"{function}_{field}", AGGREGATES[function](field)
+
+
+def build_cube(queryset, dimensions, measures):
+    """Group ``queryset`` by ``dimensions`` and compute ``measures`` per cell.
+
+    Returns the cells column-wise: one list per dimension and per measure,
+    all of the same length, ordered by the dimensions.
+    """
+    aggregates = dict(parse_measure(measure) for measure in measures)
+    cells = (
+        queryset
+        .values(*dimensions)
+        .annotate(**aggregates)
+        .order_by(*dimensions)
+        .values_list(*dimensions, *aggregates)
+    )
+    names = [*dimensions, *aggregates]
+    columns = [list(column) for column in zip(*cells)] or [[] for _ in names]
+    for name, column in zip(names, columns):
+        if name.startswith("avg_"):
+            column[:] = [None if value is None else round(value, 2) for value in column]
+    return {
+        "dimensions": list(dimensions),
+        "measures": list(aggregates),
+        "cells": len(columns[0]),
+        "columns": dict(zip(names, columns)),
+    }
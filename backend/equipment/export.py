@@ -0,0 +1,102 @@
+# backend/equipment/export.py
+"""Streaming bulk export of Equipment rows as CSV, NDJSON or Parquet.
+
+Rows are read with ``values_list().iterator()`` a chunk at a time and each
+chunk is encoded and handed to the response as soon as it is read, so the
+first bytes go out right away and memory stays flat whatever the row count.
+Columns carry the upload headers, so an export can be uploaded again as is.
+Parquet is written one row group per chunk into a ChunkBuffer that is
+drained after every group.
+"""
+import csv
+import io
+import json
+import zlib
+from itertools import islice
+
+from django.conf import settings
+
+from .parsing import PREVIEW_COLUMNS, pa, pq
+from .pdfstream import ChunkBuffer
+from .snapshots import SNAPSHOT_SCHEMA
+
+# Export format -> (content type, file extension)
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+COMPRESSIONS = ("none", "gzip")
+
+
+def get_export_chunk_size():
+    """Rows fetched per query round trip (and per Parquet row group)."""
+    return getattr(settings, "EQUIPMENT_EXPORT_CHUNK_SIZE", 10000)
+
+
+def export_columns(fields):
+    """Upload headers of Equipment ``fields`` (``name`` -> ``equipment_name``)."""
+    return [PREVIEW_COLUMNS.get(field, field) for field in fields]
+
+
+def row_chunks(queryset, fields, chunk_size=None):
+    """Lists of up to ``chunk_size`` value tuples of ``fields``, in equipment_id order."""
+    chunk_size = chunk_size or get_export_chunk_size()
+    rows = queryset.order_by("equipment_id").values_list(*fields).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_csv(chunks, fields):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(export_columns(fields))
+    yield buffer.getvalue().encode()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+
+
+def iter_ndjson(chunks, fields):
+    columns = export_columns(fields)
+    for chunk in chunks:
+        yield "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in chunk).encode()
+
+
+def iter_parquet(chunks, fields):
+    schema = pa.schema([
+        SNAPSHOT_SCHEMA.field(field).with_name(column) for field, column in zip(fields, export_columns(fields))
+    ])
+    sink = ChunkBuffer()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema) as writer:
+        for chunk in chunks:
+            columns = [list(column) for column in zip(*chunk)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+    # Footer (schema and row group offsets)
+    yield sink.drain()
+
+
+ENCODERS = {"csv": iter_csv, "ndjson": iter_ndjson, "parquet": iter_parquet}
+
+
+def gzip_stream(chunks, level=6):
+    """gzip ``chunks`` on the fly, flushing after each so none is held back."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(queryset, fields, format="csv", compression="none"):
+    """Encoded export of ``queryset``, as an iterator of byte strings."""
+    chunks = ENCODERS[format](row_chunks(queryset, fields), fields)
+    return gzip_stream(chunks) if compression == "gzip" else chunks
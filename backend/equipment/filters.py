@@ -0,0 +1,54 @@
+# backend/equipment/filters.py
+"""Row filters shared by the read endpoints (?status=, ?location=, ...)."""
+import numpy as np
+from django.db.models import Subquery
+
+from .models import Dataset, Equipment
+
+# Filters matching any of several comma-separated values
+VALUE_FILTERS = ("type", "status", "location")
+
+
+def dataset_rows(dataset_id=None):
+    """Equipment of published dataset ``dataset_id``, else of the latest dataset.
+
+    The latest dataset is resolved by a subquery, so scoping costs no
+    extra round trip.
+    """
+    if dataset_id is None:
+        latest = Dataset.objects.values("id")[:1]
+        return Equipment.objects.filter(dataset_id=Subquery(latest))
+    return Equipment.objects.filter(dataset_id=dataset_id, dataset__published_at__isnull=False)
+
+
+def filter_equipment(queryset, filters):
+    """Narrow ``queryset`` by validated filters (see EquipmentFilterSerializer)."""
+    for field in VALUE_FILTERS:
+        if filters.get(field):
+            queryset = queryset.filter(**{f"{field}__in": filters[field]})
+    if filters.get("purchase_year_min") is not None:
+        queryset = queryset.filter(purchase_year__gte=filters["purchase_year_min"])
+    if filters.get("purchase_year_max") is not None:
+        queryset = queryset.filter(purchase_year__lte=filters["purchase_year_max"])
+    return queryset
+
+
+def filter_columns(filters):
+    """Columns ``filter_frame`` needs to apply ``filters``."""
+    columns = [field for field in VALUE_FILTERS if filters.get(field)]
+    if filters.get("purchase_year_min") is not None or filters.get("purchase_year_max") is not None:
+        columns.append("purchase_year")
+    return columns
+
+
+def filter_frame(frame, filters):
+    """``filter_equipment`` for a DataFrame of rows (e.g. a snapshot)."""
+    keep = np.ones(len(frame), dtype=bool)
+    for field in VALUE_FILTERS:
+        if filters.get(field):
+            keep &= frame[field].isin(filters[field]).to_numpy()
+    if filters.get("purchase_year_min") is not None:
+        keep &= (frame["purchase_year"] >= filters["purchase_year_min"]).to_numpy()
+    if filters.get("purchase_year_max") is not None:
+        keep &= (frame["purchase_year"] <= filters["purchase_year_max"]).to_numpy()
+    return frame[keep]
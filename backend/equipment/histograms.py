@@ -0,0 +1,104 @@
+# backend/equipment/histograms.py
+"""Binned distributions of numeric Equipment columns, computed with NumPy.
+
+Columns are read from the dataset's Parquet snapshot (or the ORM when it
+has none), so a histogram over millions of rows transfers only its edges
+and counts to the client.
+"""
+import math
+from datetime import date
+
+import numpy as np
+
+# Histogram field -> stored column it is derived from
+HISTOGRAM_FIELDS = {
+    "purchase_year": "purchase_year",
+    "age": "purchase_year",
+    "flowrate": "flowrate",
+    "pressure": "pressure",
+    "temperature": "temperature",
+}
+
+# Fields holding whole numbers; their fixed-width bins get integer edges
+INTEGER_FIELDS = ("purchase_year", "age")
+
+METHODS = ("fixed", "quantile")
+
+# Most bins a histogram may have (on each axis), however they are asked for
+MAX_BINS = 500
+
+
+def _check_bins(count):
+    if count > MAX_BINS:
+        raise ValueError(f"{count} bins of this width exceed the limit of {MAX_BINS}; use a larger width")
+
+
+def field_values(frame, field):
+    """Values of histogram ``field`` as a float array (NaN where missing)."""
+    values = frame[HISTOGRAM_FIELDS[field]].to_numpy(dtype=float)
+    if field == "age":
+        values = date.today().year - values
+    return values
+
+
+def bin_edges(values, field, method="fixed", bins=20, width=None, lo=None, hi=None):
+    """Bin edges for ``values``: ``bins`` equal-width bins (or bins of
+    ``width``) over [lo, hi], or ``bins`` quantile bins holding about the
+    same number of rows each.
+
+    Raises ValueError when ``width`` would give more than MAX_BINS bins.
+    """
+    lo = values.min() if lo is None else lo
+    hi = max(values.max() if hi is None else hi, lo)
+    if method == "quantile":
+        inside = values[(values >= lo) & (values <= hi)]
+        edges = np.unique(np.quantile(inside, np.linspace(0, 1, bins + 1))) if len(inside) else []
+        # A single distinct value still gets one bin
+        return edges if len(edges) > 1 else np.array([lo, max(hi, lo + 1)])
+    if field in INTEGER_FIELDS:
+        # [edge, edge + width) buckets of whole years, e.g. ages 0-4, 5-9, ...
+        size = max(1, math.ceil(width or (hi - lo + 1) / bins))
+        lo = math.floor(lo / size) * size
+        count = math.ceil((hi + 1 - lo) / size)
+        if width:
+            _check_bins(count)
+        return lo + size * np.arange(count + 1)
+    if width:
+        lo = math.floor(lo / width) * width
+        # Counted before any array is built: a tiny width must not allocate millions of edges
+        count = max(1, math.ceil((hi - lo) / width))
+        _check_bins(count)
+        return lo + width * np.arange(count + 1)
+    return np.histogram_bin_edges(values, bins=bins, range=(lo, hi))
+
+
+def _edges(edges):
+    return np.round(np.asarray(edges, dtype=float), 6)
+
+
+def histogram(values, field, **options):
+    """1D histogram of ``values``: ``{"edges": [...], "counts": [...]}`` as NumPy arrays."""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {"edges": [], "counts": [], "total": 0}
+    edges = bin_edges(values, field, **options)
+    counts, _ = np.histogram(values, bins=edges)
+    return {"edges": _edges(edges), "counts": counts, "total": int(counts.sum())}
+
+
+def histogram_2d(x_values, y_values, x_field, y_field, **options):
+    """2D histogram: ``counts[i][j]`` rows fall in x bin ``i`` and y bin ``j``."""
+    keep = ~(np.isnan(x_values) | np.isnan(y_values))
+    x_values, y_values = x_values[keep], y_values[keep]
+    if not len(x_values):
+        return {"x_edges": [], "y_edges": [], "counts": [], "total": 0}
+    x_edges = bin_edges(x_values, x_field, **options)
+    y_edges = bin_edges(y_values, y_field, **options)
+    counts, _, _ = np.histogram2d(x_values, y_values, bins=[x_edges, y_edges])
+    counts = counts.astype(int)
+    return {
+        "x_edges": _edges(x_edges),
+        "y_edges": _edges(y_edges),
+        "counts": counts,
+        "total": int(counts.sum()),
+    }
@@ -0,0 +1,418 @@
+# backend/equipment/ingest.py
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import parsing
+from .caching import bump_data_version
+from .models import Dataset, Equipment
+from .parsing import (
+    MODEL_FIELDS,
+    PREVIEW_ROWS,
+    PROCESS_VARIABLES,
+    IngestError,
+    SeenIds,
+    clean_frame,
+    preview_records,
+    validate_columns,
+)
+from .reports import delete_reports, prerender_enabled, prerender_report
+from .snapshots import SnapshotWriter, delete_snapshot
+from .summary import SummaryAccumulator
+
+# Seconds between heartbeats while waiting for a file to be parsed
+PARSE_WAIT_SECONDS = 30
+
+# Fields compared when diffing an incremental upload (everything but the key)
+UPDATE_FIELDS = MODEL_FIELDS[1:]
+
+
+def get_batch_size(value=None):
+    """Resolve the bulk_create batch size from an override or settings."""
+    if value:
+        return max(1, int(value))
+    return getattr(settings, "EQUIPMENT_INGEST_BATCH_SIZE", 5000)
+
+
+def get_chunk_size(value=None):
+    """Resolve how many CSV rows are parsed and held in memory at once."""
+    if value:
+        return max(1, int(value))
+    return getattr(settings, "EQUIPMENT_INGEST_CHUNK_SIZE", 50000)
+
+
+def get_parse_processes():
+    """Worker processes used to parse multi-file uploads (default: all cores)."""
+    return getattr(settings, "EQUIPMENT_PARSE_PROCESSES", None) or os.cpu_count() or 1
+
+
+def read_chunks(file, chunksize=None, name=""):
+    """Parse an upload lazily, one DataFrame of ``chunksize`` rows at a time."""
+    return parsing.read_chunks(file, get_chunk_size(chunksize), name)
+
+
+def column_values(series):
+    """A frame column as a list, with missing values as None (NULL)."""
+    if series.dtype.kind == "f" and series.isna().any():
+        return series.astype(object).where(series.notna(), None).tolist()
+    return series.tolist()
+
+
+def build_instances(frame, dataset):
+    """Build unsaved Equipment rows from a model frame instead of via iterrows()."""
+    columns = [column_values(frame[field]) for field in MODEL_FIELDS]
+    return [
+        Equipment(dataset_id=dataset.pk, **dict(zip(MODEL_FIELDS, values)))
+        for values in zip(*columns)
+    ]
+
+
+def rejected_ids(chunk, frame):
+    """Well-formed equipment_ids of the rows of ``chunk`` left out of its cleaned ``frame``."""
+    ids = pd.to_numeric(chunk["equipment_id"].drop(frame.index), errors="coerce")
+    return ids[(ids > 0) & (ids % 1 == 0)].astype(np.int64).to_numpy()
+
+
+class UploadReport:
+    """Running totals for one upload: rows, rejected rows, preview and timing."""
+
+    def __init__(self, progress=None):
+        self.progress = progress
+        self.limit = getattr(settings, "EQUIPMENT_MAX_REJECTED_REPORT", 1000)
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.processed = 0
+        self.rejected_rows = 0
+        self.rejected = []
+        self.rejected_ids = []   # well-formed equipment_ids of rejected rows
+        self.seen = SeenIds()    # equipment_ids of the valid rows
+        self.preview = []
+
+    def validated(self, chunks):
+        """Yield the cleaned frame of every chunk, recording what was rejected.
+
+        ``chunks`` is a DataFrame or an iterable of DataFrames (see
+        ``read_chunks``); only one chunk is held in memory at a time.
+        """
+        if isinstance(chunks, pd.DataFrame):
+            chunks = [chunks]
+
+        for chunk in chunks:
+            validate_columns(chunk)
+            frame, rejected = clean_frame(chunk, self.seen)
+            if len(self.preview) < PREVIEW_ROWS:
+                self.preview += preview_records(frame, PREVIEW_ROWS - len(self.preview))
+            self.add_rejected(rejected, len(rejected))
+            if rejected:
+                self.rejected_ids.append(rejected_ids(chunk, frame))
+
+            yield frame
+
+            self.rows += len(frame)
+            self.processed += len(chunk)
+            self.heartbeat()
+
+        if not self.rows and self.rejected_rows:
+            raise IngestError("No valid rows in upload")
+
+    def heartbeat(self):
+        """Report the rows processed so far (again, during long writes and parses)."""
+        if self.progress:
+            self.progress(self.processed)
+
+    def add_rejected(self, rejected, count):
+        """Count ``count`` rejected rows, listing them up to EQUIPMENT_MAX_REJECTED_REPORT."""
+        self.rejected_rows += count
+        self.rejected += rejected[:max(0, self.limit - len(self.rejected))]
+
+    def finish(self, **extra):
+        elapsed = time.perf_counter() - self.started
+        return {
+            "rows": self.rows,
+            **extra,
+            "rejected_rows": self.rejected_rows,
+            "rejected": self.rejected,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.processed / elapsed) if elapsed else self.processed,
+            "data_preview": self.preview,
+        }
+
+
+def stage_dataset(name="", content_hash="", mode="replace"):
+    """Create an unpublished Dataset for an upload to write its rows into."""
+    return Dataset.all_objects.create(name=name, content_hash=content_hash, mode=mode)
+
+
+def discard_dataset(dataset_id):
+    """Delete a dataset with its rows, snapshot and reports."""
+    Dataset.all_objects.filter(pk=dataset_id).delete()
+    delete_snapshot(dataset_id)
+    delete_reports(dataset_id)
+
+
+@contextmanager
+def staging(dataset):
+    """Discard ``dataset`` (staged for an upload) if the upload fails."""
+    try:
+        yield dataset
+    except BaseException:
+        discard_dataset(dataset.pk)
+        raise
+
+
+def write_rows(frame, dataset, batch_size, report=None):
+    """Insert the rows of ``frame`` into ``dataset``, committing each batch on its own.
+
+    Outside a transaction every bulk_create commits as it goes, so an
+    upload holds SQLite's write lock for one batch at a time and other
+    requests (new jobs, job status) can write in between. ``report`` (an
+    UploadReport) is sent a heartbeat after every batch.
+    """
+    for start in range(0, len(frame), batch_size):
+        batch = build_instances(frame.iloc[start:start + batch_size], dataset)
+        Equipment.objects.bulk_create(batch, batch_size=batch_size)
+        if report is not None:
+            report.heartbeat()
+
+
+def publish_dataset(dataset, report, name, content_hash, summary):
+    """Store the summary row, row count and preview of ``dataset`` and publish it.
+
+    One short transaction: readers see the whole new dataset or none of
+    it. Cached responses are superseded once it commits, and the PDF
+    report of the new contents is rendered then.
+    """
+    with transaction.atomic():
+        summary.save(dataset)
+        dataset.name = name
+        dataset.content_hash = content_hash
+        dataset.row_count = summary.total
+        dataset.preview = report.preview
+        dataset.published_at = timezone.now()
+        dataset.save()
+        transaction.on_commit(bump_data_version)
+        if prerender_enabled():
+            # robust: a failed render must not fail an ingest that already committed
+            transaction.on_commit(lambda: prerender_report(dataset.pk), robust=True)
+        prune_datasets()
+
+
+def prune_datasets(keep=None):
+    """Delete all but the newest ``keep`` datasets (EQUIPMENT_DATASET_RETENTION)."""
+    keep = keep or getattr(settings, "EQUIPMENT_DATASET_RETENTION", None)
+    if keep:
+        old = list(Dataset.objects.values_list("pk", flat=True)[keep:])
+        if old:
+            Dataset.objects.filter(pk__in=old).delete()
+            for dataset_id in old:
+                transaction.on_commit(lambda dataset_id=dataset_id: delete_snapshot(dataset_id))
+                transaction.on_commit(lambda dataset_id=dataset_id: delete_reports(dataset_id))
+
+
+def bulk_ingest(chunks, name="", content_hash="", batch_size=None, progress=None, dataset=None):
+    """Load the valid rows of ``chunks`` into a new Dataset.
+
+    Rows are committed batch by batch into a staged dataset (``dataset``,
+    else a new one), which is published once every row is written; a
+    failed upload deletes it again. Invalid rows are reported, not
+    written. ``progress`` is called with the running count of processed
+    rows after every chunk.
+    """
+    batch_size = get_batch_size(batch_size)
+    report = UploadReport(progress)
+    summary = SummaryAccumulator()
+
+    dataset = dataset or stage_dataset(name, content_hash)
+    with staging(dataset):
+        with SnapshotWriter(dataset.pk) as snapshot:
+            for frame in report.validated(chunks):
+                write_rows(frame, dataset, batch_size, report)
+                snapshot.write(frame)
+                summary.add(frame)
+        publish_dataset(dataset, report, name, content_hash, summary)
+
+    return report.finish(dataset_id=dataset.pk, batch_size=batch_size)
+
+
+def multi_file_ingest(uploads, name="", content_hash="", batch_size=None,
+                      chunk_size=None, progress=None, dataset=None):
+    """Load several uploads (CSVs or ZIPs of CSVs) into one new Dataset.
+
+    ``uploads`` is a list of ``(path, file name)``. Every CSV is parsed and
+    validated in its own worker process, which spools its valid rows to a
+    temporary file chunk by chunk. The files are merged in upload order
+    (ids must be unique across files): each one is written batch by batch
+    into a staged dataset, as in ``bulk_ingest``, as soon as it and the
+    files before it are parsed, while the rest are still being parsed.
+    """
+    batch_size = get_batch_size(batch_size)
+    chunk_size = get_chunk_size(chunk_size)
+    report = UploadReport(progress)
+    sources = [
+        source for path, upload_name in uploads
+        for source in parsing.upload_sources(path, upload_name)
+    ]
+
+    seen = SeenIds()
+    files = []
+    parse_seconds = write_seconds = 0.0
+    summary = SummaryAccumulator()
+    dataset = dataset or stage_dataset(name, content_hash)
+    with staging(dataset), tempfile.TemporaryDirectory(prefix="equipment-parse-") as spool_dir:
+        # Spawned workers import only equipment.parsing, never Django
+        context = multiprocessing.get_context("spawn")
+        workers = min(len(sources), get_parse_processes())
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, \
+                SnapshotWriter(dataset.pk) as snapshot:
+            futures = [
+                pool.submit(parsing.parse_source, *source, chunk_size, report.limit, spool_dir)
+                for source in sources
+            ]
+            for future in futures:
+                waited = time.perf_counter()
+                # A big file can take a while: keep the job from looking lost meanwhile
+                while not wait([future], timeout=PARSE_WAIT_SECONDS).done:
+                    report.heartbeat()
+                result = future.result()
+                parse_seconds += time.perf_counter() - waited
+
+                written = time.perf_counter()
+                rows, rejected, rejected_rows = 0, list(result["rejected"]), result["rejected_rows"]
+                for frame in parsing.iter_spooled(result["spool"]):
+                    duplicate = seen.contains(frame["equipment_id"].to_numpy())
+                    if duplicate.any():
+                        rejected += [
+                            {"row": int(index) + 2, "equipment_id": int(equipment_id),
+                             "reasons": ["duplicate equipment_id"], "file": result["file"]}
+                            for index, equipment_id in
+                            zip(frame.index[duplicate], frame["equipment_id"][duplicate])
+                        ]
+                        rejected_rows += int(duplicate.sum())
+                        frame = frame[~duplicate]
+                    seen.add(frame["equipment_id"].to_numpy())
+                    write_rows(frame, dataset, batch_size, report)
+                    snapshot.write(frame)
+                    summary.add(frame)
+                    rows += len(frame)
+                os.remove(result["spool"])
+                write_seconds += time.perf_counter() - written
+
+                report.rows += rows
+                report.processed += result["rows_read"]
+                report.add_rejected(rejected, rejected_rows)
+                report.heartbeat()
+                if len(report.preview) < PREVIEW_ROWS:
+                    report.preview += result["preview"][:PREVIEW_ROWS - len(report.preview)]
+                files.append({
+                    "file": result["file"],
+                    "rows": rows,
+                    "rejected_rows": rejected_rows,
+                    "parse_seconds": result["parse_seconds"],
+                })
+
+        if not report.rows and report.rejected_rows:
+            raise IngestError("No valid rows in upload")
+        publish_dataset(dataset, report, name, content_hash, summary)
+
+    return report.finish(
+        dataset_id=dataset.pk,
+        batch_size=batch_size,
+        parse_seconds=round(parse_seconds, 3),
+        write_seconds=round(write_seconds, 3),
+        files=files,
+    )
+
+
+def stored_rows(dataset, ids):
+    """Rows of ``dataset`` whose equipment_id is in ``ids``, as a frame indexed by equipment_id."""
+    frames = [pd.DataFrame(columns=MODEL_FIELDS)]
+    if dataset is not None:
+        # One parameter per id, within the backend's limit
+        size = (connection.features.max_query_params or 10000) - 1
+        for start in range(0, len(ids), size):
+            rows = dataset.equipment.filter(equipment_id__in=ids[start:start + size].tolist())
+            frames.append(pd.DataFrame.from_records(rows.values_list(*MODEL_FIELDS), columns=MODEL_FIELDS))
+    stored = pd.concat(frames) if len(frames) > 1 else frames[0]
+    stored = stored.astype({field: float for field in PROCESS_VARIABLES})
+    return stored.set_index("equipment_id")
+
+
+def incremental_ingest(chunks, name="", content_hash="", batch_size=None, progress=None, dataset=None):
+    """Apply the valid rows of ``chunks`` to the latest Dataset as a new version, keyed on equipment_id.
+
+    The upload is diffed chunk by chunk against the stored rows with the
+    same ids, which are looked up per chunk, so neither side is ever held
+    whole in memory. The new version (``dataset``, else a new staged
+    dataset) holds the upload's valid rows plus the stored rows whose line
+    in the upload was rejected (e.g. a typo in one cell): those are kept as
+    they were and listed in the report as ``kept``. Stored rows missing
+    from the upload are left out. The previous version stays untouched in
+    the history.
+
+    Returns the counts of inserted, updated, deleted and unchanged rows
+    relative to the previous version.
+    """
+    batch_size = get_batch_size(batch_size)
+    report = UploadReport(progress)
+    summary = SummaryAccumulator()
+    inserted = updated = unchanged = 0
+
+    base = Dataset.objects.first()
+    dataset = dataset or stage_dataset(name, content_hash, mode="incremental")
+    with staging(dataset):
+        with SnapshotWriter(dataset.pk) as snapshot:
+            for frame in report.validated(chunks):
+                ids = frame["equipment_id"].to_numpy()
+                old = stored_rows(base, ids)
+                known = frame["equipment_id"].isin(old.index).to_numpy()
+                inserted += int((~known).sum())
+
+                # Stored rows: compare every field against the stored values
+                existing = frame[known]
+                old = old.loc[existing["equipment_id"]]
+                differs = np.zeros(len(existing), dtype=bool)
+                for field in UPDATE_FIELDS:
+                    new_values, old_values = existing[field].to_numpy(), old[field].to_numpy()
+                    differs |= (new_values != old_values) & ~(pd.isna(new_values) & pd.isna(old_values))
+                updated += int(differs.sum())
+                unchanged += int((~differs).sum())
+
+                write_rows(frame, dataset, batch_size, report)
+                snapshot.write(frame)
+                summary.add(frame)
+
+            # Stored rows whose line was rejected stay as they were
+            kept_ids = []
+            if report.rejected_ids:
+                ids = np.unique(np.concatenate(report.rejected_ids))
+                kept = stored_rows(base, ids[~report.seen.contains(ids)]).reset_index()
+                write_rows(kept, dataset, batch_size, report)
+                snapshot.write(kept)
+                summary.add(kept)
+                kept_ids = kept["equipment_id"].tolist()
+
+        # Stored rows that are no longer in the upload
+        stored = base.equipment.count() if base is not None else 0
+        deleted = stored - (updated + unchanged) - len(kept_ids)
+
+        publish_dataset(dataset, report, name, content_hash, summary)
+
+    return report.finish(
+        dataset_id=dataset.pk,
+        inserted=inserted,
+        updated=updated,
+        deleted=deleted,
+        unchanged=unchanged,
+        kept=len(kept_ids),
+        kept_ids=kept_ids[:report.limit],
+        batch_size=batch_size,
+    )
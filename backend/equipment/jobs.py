@@ -0,0 +1,271 @@
+# backend/equipment/jobs.py
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from .ingest import (
+    bulk_ingest, discard_dataset, incremental_ingest, multi_file_ingest, read_chunks, stage_dataset,
+)
+from .models import Dataset, IngestJob
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Rows processed by running jobs. Kept in the cache rather than on the job
+# row so reporting it costs no database write per chunk, and polls served
+# by any server process can read it.
+PROGRESS_KEY = "equipment:job-progress:{}"
+PROGRESS_TIMEOUT = 24 * 3600
+
+# Set (with a timeout) while a queued or running job has a live worker.
+# Jobs of a server that stopped or crashed stop refreshing it and are
+# failed once it expires, instead of looking busy forever.
+HEARTBEAT_KEY = "equipment:job-alive:{}"
+
+# Jobs queued on this process's pool and not finished yet
+_pending = set()
+
+
+def get_executor():
+    """Lazily start the local ingest worker pool (no external broker)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "EQUIPMENT_INGEST_WORKERS", 1),
+                thread_name_prefix="equipment-ingest",
+            )
+        return _executor
+
+
+def spool_upload(file):
+    """Copy an UploadedFile to MEDIA_ROOT so it outlives the request.
+
+    The sha256 of the bytes is computed on the same pass and returned
+    alongside the spooled path.
+    """
+    spool_dir = os.path.join(settings.MEDIA_ROOT, "uploads")
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f"{uuid.uuid4().hex}{os.path.splitext(file.name)[1]}")
+    digest = hashlib.sha256()
+    with open(path, "wb") as out:
+        for block in file.chunks():
+            digest.update(block)
+            out.write(block)
+    return path, digest.hexdigest()
+
+
+def spool_uploads(files):
+    """Spool every uploaded file; returns ``[(path, name)]`` and one content hash.
+
+    A single file keeps its own digest; several files hash their digests in
+    upload order.
+    """
+    uploads, digests = [], []
+    for file in files:
+        path, digest = spool_upload(file)
+        uploads.append((path, file.name))
+        digests.append(digest)
+    if len(digests) == 1:
+        return uploads, digests[0]
+    return uploads, hashlib.sha256("".join(digests).encode()).hexdigest()
+
+
+def discard_uploads(uploads):
+    for path, _ in uploads:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def get_heartbeat_timeout():
+    """Seconds without progress after which a queued or running job counts as lost."""
+    return getattr(settings, "EQUIPMENT_JOB_HEARTBEAT_TIMEOUT", 600)
+
+
+def heartbeat(*job_ids):
+    cache.set_many({HEARTBEAT_KEY.format(job_id): True for job_id in job_ids}, get_heartbeat_timeout())
+
+
+def fail_stale_jobs():
+    """Mark queued/running jobs whose worker has gone (no heartbeat) as failed.
+
+    The rows they had staged are deleted; they were never published.
+    """
+    unfinished = IngestJob.objects.filter(status__in=[IngestJob.STATUS_QUEUED, IngestJob.STATUS_RUNNING])
+    for job in unfinished.only("pk", "dataset_id"):
+        if cache.get(HEARTBEAT_KEY.format(job.pk)) is None:
+            unfinished.filter(pk=job.pk).update(
+                status=IngestJob.STATUS_FAILED,
+                errors=["Interrupted: the worker stopped before the job finished"],
+                finished_at=timezone.now(),
+            )
+            if job.dataset_id and not Dataset.objects.filter(pk=job.dataset_id).exists():
+                discard_dataset(job.dataset_id)
+
+
+def find_duplicate(content_hash, mode="replace"):
+    """The latest dataset, if a ``mode`` upload of the same bytes produced it.
+
+    Uploading those bytes again that way would change nothing, so parsing
+    and writing can be skipped.
+    """
+    fail_stale_jobs()
+    latest = Dataset.objects.defer("preview").first()
+    if latest is not None and latest.content_hash == content_hash and latest.mode == mode:
+        return latest
+    return None
+
+
+def find_running_duplicate(content_hash, mode="replace"):
+    """A queued or running job (with a live worker) ingesting the same bytes the same way."""
+    return IngestJob.objects.filter(
+        status__in=[IngestJob.STATUS_QUEUED, IngestJob.STATUS_RUNNING], content_hash=content_hash, mode=mode
+    ).first()
+
+
+def duplicate_result(dataset):
+    """Upload response for a repeated upload of ``dataset``'s bytes."""
+    job = dataset.jobs.filter(status=IngestJob.STATUS_SUCCEEDED).first()
+    if job is not None:
+        return {**job.result, "deduplicated": True, "job_id": str(job.pk)}
+    # Loaded without a job (e.g. by a benchmark or a shell)
+    return {
+        "message": "File uploaded successfully",
+        "mode": dataset.mode,
+        "dataset_id": dataset.pk,
+        "rows": dataset.row_count,
+        "data_preview": Dataset.objects.values_list("preview", flat=True).get(pk=dataset.pk),
+        "deduplicated": True,
+        "job_id": None,
+    }
+
+
+def create_job(file_name, content_hash, mode="replace"):
+    """Record a queued job for a spooled upload."""
+    job = IngestJob.objects.create(file_name=file_name, content_hash=content_hash, mode=mode)
+    heartbeat(job.pk)
+    return job
+
+
+def build_result(mode, stats):
+    result = {
+        "message": "File uploaded successfully",
+        "mode": mode,
+        "dataset_id": stats["dataset_id"],
+        "rows": stats["rows"],
+        "rejected_rows": stats["rejected_rows"],
+        "rejected": stats["rejected"],
+        "elapsed_seconds": stats["elapsed_seconds"],
+        "rows_per_second": stats["rows_per_second"],
+    }
+    if mode == "incremental":
+        for key in ("inserted", "updated", "deleted", "unchanged", "kept", "kept_ids"):
+            result[key] = stats[key]
+    if "files" in stats:
+        for key in ("parse_seconds", "write_seconds", "files"):
+            result[key] = stats[key]
+    # First 10 rows for frontend preview
+    result["data_preview"] = stats["data_preview"]
+    return result
+
+
+def is_multi_file(uploads):
+    return len(uploads) > 1 or uploads[0][1].lower().endswith(".zip")
+
+
+def run_job(job_id, uploads, options):
+    """Parse and save spooled uploads, recording status on the job row.
+
+    A single CSV is streamed chunk by chunk; several files or a ZIP archive
+    are parsed in parallel and merged into one dataset.
+    """
+    _pending.discard(job_id)
+    started = IngestJob.objects.filter(pk=job_id, status=IngestJob.STATUS_QUEUED).update(
+        status=IngestJob.STATUS_RUNNING, started_at=timezone.now()
+    )
+    job = IngestJob.objects.get(pk=job_id)
+    if not started:
+        # Given up on as stale while it waited in the queue
+        discard_uploads(uploads)
+        return job
+
+    # Staged up front and linked to the job, so the rows of a job whose
+    # worker dies can be found and deleted (see fail_stale_jobs)
+    dataset = stage_dataset(job.file_name, job.content_hash, job.mode)
+    IngestJob.objects.filter(pk=job_id).update(dataset=dataset)
+
+    def progress(rows):
+        cache.set(PROGRESS_KEY.format(job_id), rows, PROGRESS_TIMEOUT)
+        # Keep this job and the ones queued behind it from looking lost
+        heartbeat(job_id, *_pending)
+
+    try:
+        if is_multi_file(uploads):
+            stats = multi_file_ingest(
+                uploads,
+                name=job.file_name,
+                content_hash=job.content_hash,
+                batch_size=options.get("batch_size"),
+                chunk_size=options.get("chunk_size"),
+                progress=progress,
+                dataset=dataset,
+            )
+        else:
+            ingest = incremental_ingest if job.mode == "incremental" else bulk_ingest
+            with open(uploads[0][0], "rb") as file:
+                stats = ingest(
+                    read_chunks(file, chunksize=options.get("chunk_size"), name=uploads[0][1]),
+                    name=job.file_name,
+                    content_hash=job.content_hash,
+                    batch_size=options.get("batch_size"),
+                    progress=progress,
+                    dataset=dataset,
+                )
+        job.status = IngestJob.STATUS_SUCCEEDED
+        job.dataset_id = stats["dataset_id"]
+        job.rows_processed = stats["rows"] + stats["rejected_rows"]
+        job.result = build_result(job.mode, stats)
+    except Exception as e:
+        job.status = IngestJob.STATUS_FAILED
+        job.dataset = None
+        if dataset is not None and not Dataset.objects.filter(pk=dataset.pk).exists():
+            # Failed before writing began (e.g. a bad file in a ZIP)
+            discard_dataset(dataset.pk)
+        job.rows_processed = cache.get(PROGRESS_KEY.format(job_id), 0)
+        job.errors = [str(e)]
+    finally:
+        cache.delete_many([PROGRESS_KEY.format(job_id), HEARTBEAT_KEY.format(job_id)])
+        discard_uploads(uploads)
+
+    job.finished_at = timezone.now()
+    job.save()
+    return job
+
+
+def _run_in_worker(job_id, uploads, options):
+    close_old_connections()
+    try:
+        run_job(job_id, uploads, options)
+    finally:
+        # Worker threads are reused; don't leave their connections open
+        connections.close_all()
+
+
+def submit_job(job, uploads, options):
+    """Run ``job`` on the worker pool and return immediately."""
+    _pending.add(job.pk)
+    get_executor().submit(_run_in_worker, job.pk, uploads, options)
+
+
+def get_progress(job):
+    """Rows processed so far, including progress not yet committed."""
+    if job.status in (IngestJob.STATUS_SUCCEEDED, IngestJob.STATUS_FAILED):
+        return job.rows_processed
+    return max(job.rows_processed, cache.get(PROGRESS_KEY.format(job.pk), 0))
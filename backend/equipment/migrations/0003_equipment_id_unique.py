@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_remove_equipment_flowrate_remove_equipment_pressure_and_more'),
+    ]
+
+    # Only indexed: databases from before datasets existed can hold repeated
+    # ids (each upload was appended), so uniqueness waits for 0006, where it
+    # is enforced per dataset
+    operations = [
+        migrations.AlterField(
+            model_name='equipment',
+            name='equipment_id',
+            field=models.IntegerField(db_index=True),
+        ),
+    ]
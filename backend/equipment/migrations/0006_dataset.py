@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def assign_existing_rows(apps, schema_editor):
+    """Put rows loaded before datasets existed into one dataset of their own.
+
+    Those rows could repeat an equipment_id; only the last row loaded for
+    each id is kept, as ids are unique within a dataset.
+    """
+    Dataset = apps.get_model('equipment', 'Dataset')
+    Equipment = apps.get_model('equipment', 'Equipment')
+    latest = Equipment.objects.values('equipment_id').annotate(last=Max('id')).values('last')
+    Equipment.objects.exclude(id__in=latest).delete()
+    count = Equipment.objects.count()
+    if count:
+        dataset = Dataset.objects.create(name='Existing data', row_count=count)
+        Equipment.objects.update(dataset=dataset)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_ingestjob_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Dataset',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('content_hash', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('row_count', models.IntegerField(default=0)),
+                ('stats', models.JSONField(blank=True, default=dict)),
+                ('preview', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='equipment',
+            name='equipment_id',
+            field=models.IntegerField(),
+        ),
+        migrations.AddField(
+            model_name='equipment',
+            name='dataset',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='equipment', to='equipment.dataset'),
+        ),
+        migrations.RunPython(assign_existing_rows, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='equipment',
+            name='dataset',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='equipment', to='equipment.dataset'),
+        ),
+        migrations.AddField(
+            model_name='ingestjob',
+            name='dataset',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='jobs', to='equipment.dataset'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['dataset', 'type'], name='equipment_dataset_type_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='equipment',
+            constraint=models.UniqueConstraint(fields=('dataset', 'equipment_id'), name='unique_equipment_per_dataset'),
+        ),
+    ]
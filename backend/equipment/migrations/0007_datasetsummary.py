@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_summaries(apps, schema_editor):
+    """Compute the summary row of every existing dataset with grouped queries."""
+    Dataset = apps.get_model('equipment', 'Dataset')
+    DatasetSummary = apps.get_model('equipment', 'DatasetSummary')
+    for dataset in Dataset.objects.all():
+        rows = apps.get_model('equipment', 'Equipment').objects.filter(dataset=dataset)
+
+        def counts(field):
+            return {
+                str(value): count for value, count in
+                rows.values_list(field).annotate(count=Count('id')).order_by('-count')
+            }
+
+        years = {int(year): count for year, count in counts('purchase_year').items()}
+        DatasetSummary.objects.create(
+            dataset=dataset,
+            total=sum(years.values()),
+            purchase_year_sum=rows.aggregate(total=Sum('purchase_year'))['total'] or 0,
+            purchase_year_min=min(years, default=None),
+            purchase_year_max=max(years, default=None),
+            year_counts={str(year): years[year] for year in sorted(years)},
+            type_counts=counts('type'),
+            status_counts=counts('status'),
+            location_counts=counts('location'),
+            condition_counts=counts('condition'),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0006_dataset'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetSummary',
+            fields=[
+                ('dataset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='equipment.dataset')),
+                ('total', models.IntegerField(default=0)),
+                ('purchase_year_sum', models.BigIntegerField(default=0)),
+                ('purchase_year_min', models.IntegerField(blank=True, null=True)),
+                ('purchase_year_max', models.IntegerField(blank=True, null=True)),
+                ('year_counts', models.JSONField(blank=True, default=dict)),
+                ('type_counts', models.JSONField(blank=True, default=dict)),
+                ('status_counts', models.JSONField(blank=True, default=dict)),
+                ('location_counts', models.JSONField(blank=True, default=dict)),
+                ('condition_counts', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='dataset',
+            name='stats',
+        ),
+    ]
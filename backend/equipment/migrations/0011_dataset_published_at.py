@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:45
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def publish_existing(apps, schema_editor):
+    """Datasets from before staging were complete once created."""
+    Dataset = apps.get_model('equipment', 'Dataset')
+    Dataset.objects.update(published_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0010_process_variables'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='dataset',
+            options={'ordering': ['-published_at', '-id']},
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='published_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(publish_existing, migrations.RunPython.noop),
+    ]
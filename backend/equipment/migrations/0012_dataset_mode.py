@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:58
+
+from django.db import migrations, models
+
+
+def set_incremental_modes(apps, schema_editor):
+    """Datasets last written by an incremental upload job."""
+    Dataset = apps.get_model('equipment', 'Dataset')
+    Dataset.objects.filter(jobs__mode='incremental').update(mode='incremental')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0011_dataset_published_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='mode',
+            field=models.CharField(default='replace', max_length=20),
+        ),
+        migrations.RunPython(set_incremental_modes, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,155 @@
 # backend/equipment/models.py
+import uuid
+
 from django.db import models
 
+from .analytics import RunningStats
+from .parsing import PROCESS_VARIABLES
+from .sketches import RANK_ERROR
+
+
+class PublishedDatasetManager(models.Manager):
+    """Datasets whose upload has finished writing."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(published_at__isnull=False)
+
+
+class Dataset(models.Model):
+    """One uploaded batch of equipment rows, kept for history.
+
+    An upload writes its rows into a staged dataset in short batches and
+    only then publishes it (sets ``published_at``). ``objects`` sees
+    published datasets only, newest first; ``all_objects`` sees staged
+    ones too.
+    """
+    name = models.CharField(max_length=255)                  # uploaded file name
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # sha256 of the upload
+    mode = models.CharField(max_length=20, default='replace')  # upload mode that produced it
+    row_count = models.IntegerField(default=0)
+    preview = models.JSONField(default=list, blank=True)     # first rows of the upload
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    published_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = PublishedDatasetManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ['-published_at', '-id']
+
+    def __str__(self):
+        return f"{self.name} ({self.row_count} rows)"
+
+
+class DatasetSummary(models.Model):
+    """Summary statistics of a dataset, computed at ingest time.
+
+    Holds raw counters (sums, per-value counts) rather than finished
+    figures; as_dict() derives the API payload. Percentiles come from KLL
+    sketches (see sketches.py) built over the same rows.
+    """
+    dataset = models.OneToOneField(Dataset, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    total = models.IntegerField(default=0)
+    purchase_year_sum = models.BigIntegerField(default=0)
+    purchase_year_min = models.IntegerField(null=True, blank=True)
+    purchase_year_max = models.IntegerField(null=True, blank=True)
+    year_counts = models.JSONField(default=dict, blank=True)       # {year: rows}
+    type_counts = models.JSONField(default=dict, blank=True)
+    status_counts = models.JSONField(default=dict, blank=True)
+    location_counts = models.JSONField(default=dict, blank=True)
+    condition_counts = models.JSONField(default=dict, blank=True)
+    sketches = models.JSONField(default=dict, blank=True)          # serialized KLL sketches
+    percentiles = models.JSONField(default=dict, blank=True)       # p50/p95/p99 read from them
+    process_stats = models.JSONField(default=dict, blank=True)     # {field: {count, mean, m2, min, max}}
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def process_variables(self):
+        """avg_/std_/min_/max_ of every process variable (None without values)."""
+        fields = {}
+        for field in PROCESS_VARIABLES:
+            stored = self.process_stats.get(field) or {}
+            stats = RunningStats.from_dict(stored)
+            fields[f"avg_{field}"] = round(stats.mean, 2) if stats.count else None
+            # Summaries saved before variances were tracked have no m2
+            fields[f"std_{field}"] = round(stats.std, 2) if "m2" in stored and stats.std is not None else None
+            fields[f"min_{field}"] = stats.min if stats.count else None
+            fields[f"max_{field}"] = stats.max if stats.count else None
+        return fields
+
+    def as_dict(self):
+        return {
+            "total_equipment": self.total,
+            "avg_purchase_year": round(self.purchase_year_sum / self.total, 2) if self.total else 0,
+            "min_purchase_year": self.purchase_year_min,
+            "max_purchase_year": self.purchase_year_max,
+            "type_distribution": self.type_counts,
+            "status_distribution": self.status_counts,
+            "location_distribution": self.location_counts,
+            "condition_distribution": self.condition_counts,
+            **self.process_variables(),
+            "percentiles": self.percentiles.get("overall", {}),
+            "percentiles_by_type": self.percentiles.get("by_type", {}),
+            "percentile_rank_error": RANK_ERROR,
+        }
+
+
 class Equipment(models.Model):
-    equipment_id = models.IntegerField(default=0)           # integer default
+    dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name='equipment')
+    equipment_id = models.IntegerField()                     # upsert key within a dataset
     name = models.CharField(max_length=255)
     type = models.CharField(max_length=100)
     status = models.CharField(max_length=50, default='Unknown')
     location = models.CharField(max_length=100, default='Unknown')
     purchase_year = models.IntegerField(default=0)         # integer default
     condition = models.CharField(max_length=50, default='Unknown')
+    flowrate = models.FloatField(null=True, blank=True)      # optional process variables
+    pressure = models.FloatField(null=True, blank=True)
+    temperature = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        # Every read is scoped to one dataset, so indexes lead with it
+        indexes = [
+            models.Index(fields=['dataset', 'type', 'status'], name='equipment_ds_type_status_idx'),
+            models.Index(fields=['dataset', 'location', 'type'], name='equipment_ds_location_type_idx'),
+            models.Index(fields=['dataset', 'status', 'purchase_year'], name='equipment_ds_status_year_idx'),
+            models.Index(fields=['dataset', 'purchase_year'], name='equipment_ds_year_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['dataset', 'equipment_id'], name='unique_equipment_per_dataset'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.type})"
+
+
+class IngestJob(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file_name = models.CharField(max_length=255)
+    mode = models.CharField(max_length=20, default='replace')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # sha256 of the upload
+    dataset = models.ForeignKey(Dataset, null=True, blank=True, on_delete=models.SET_NULL, related_name='jobs')
+    rows_processed = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    result = models.JSONField(null=True, blank=True)          # upload response once finished
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
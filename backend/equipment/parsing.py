@@ -0,0 +1,361 @@
+# backend/equipment/parsing.py
+"""Parsing and validation for uploads (CSV, Parquet, Feather/Arrow IPC).
+
+Nothing here touches Django, so the functions can run in worker processes.
+"""
+import os
+import pickle
+import tempfile
+import time
+import zipfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+    import pyarrow.parquet as pq
+except ImportError:  # columnar uploads and snapshots are optional
+    pa = pq = None
+
+REQUIRED_COLUMNS = [
+    "equipment_id",
+    "equipment_name",
+    "equipment_type",
+    "status",
+    "location",
+    "purchase_year",
+    "condition",
+]
+
+# Parser schema. Only these columns are read (usecols); numeric columns are
+# read as text and coerced column-wise in clean_frame() so that one bad value
+# rejects its row instead of the whole file, and the low-cardinality text
+# columns are parsed straight into categoricals.
+CSV_DTYPES = {
+    "equipment_id": "string",
+    "equipment_name": "string",
+    "equipment_type": "category",
+    "status": "category",
+    "location": "category",
+    "purchase_year": "string",
+    "condition": "category",
+    "flowrate": "string",
+    "pressure": "string",
+    "temperature": "string",
+}
+
+# Optional process variable columns (stored as NULL when absent or empty)
+PROCESS_VARIABLES = ("flowrate", "pressure", "temperature")
+
+# Other headers the upload columns are known by (older exports, the desktop app).
+# The one header table: ingest and the desktop analytics both match it exactly.
+COLUMN_ALIASES = {
+    "Equipment Name": "equipment_name",
+    "EQUIPMENT NAME": "equipment_name",
+    "Type": "equipment_type",
+    "TYPE": "equipment_type",
+    "Flowrate": "flowrate",
+    "FLOWRATE (L/MIN)": "flowrate",
+    "Pressure": "pressure",
+    "PRESSURE (BAR)": "pressure",
+    "Temperature": "temperature",
+    "TEMPERATURE (°C)": "temperature",
+}
+CSV_DTYPES.update({alias: CSV_DTYPES[column] for alias, column in COLUMN_ALIASES.items()})
+
+MIN_PURCHASE_YEAR = 1900
+
+# Columns of a cleaned frame, i.e. the Equipment fields an upload writes
+MODEL_FIELDS = [
+    "equipment_id",
+    "name",
+    "type",
+    "status",
+    "location",
+    "purchase_year",
+    "condition",
+    *PROCESS_VARIABLES,
+]
+
+# Upload columns stored under another field name; the rest keep their name
+FIELD_NAMES = {"equipment_name": "name", "equipment_type": "type"}
+
+# Numeric Equipment fields (aggregated, binned and sketched by the read APIs)
+NUMERIC_FIELDS = ("purchase_year", *PROCESS_VARIABLES)
+
+PREVIEW_ROWS = 10
+
+# Upload previews show the upload's column names
+PREVIEW_COLUMNS = {field: column for column, field in FIELD_NAMES.items()}
+
+# Columnar upload formats, read with pyarrow instead of the CSV parser
+COLUMNAR_EXTENSIONS = (".parquet", ".feather", ".arrow")
+UPLOAD_EXTENSIONS = (".csv",) + COLUMNAR_EXTENSIONS
+
+
+class IngestError(ValueError):
+    """Raised when an upload cannot be ingested (bad columns, bad values)."""
+
+
+def is_columnar(name):
+    return name.lower().endswith(COLUMNAR_EXTENSIONS)
+
+
+def read_chunks(file, chunksize, name=""):
+    """Parse an upload lazily, one DataFrame of ``chunksize`` rows at a time.
+
+    CSV text goes through pd.read_csv with the parser schema; Parquet and
+    Feather/Arrow IPC files are read batch by batch with pyarrow and cast to
+    the same dtypes, so every format shares the same validation path.
+    """
+    if not is_columnar(name):
+        chunks = pd.read_csv(
+            file,
+            usecols=lambda col: col in CSV_DTYPES,
+            dtype=CSV_DTYPES,
+            chunksize=chunksize,
+        )
+    elif pa is None:
+        raise IngestError("Parquet and Feather uploads need pyarrow installed")
+    else:
+        chunks = _read_columnar_chunks(file, chunksize, name.lower())
+    return (_canonical_columns(chunk) for chunk in chunks)
+
+
+def _canonical_columns(chunk):
+    """Rename aliased headers (e.g. "PRESSURE (BAR)") to their schema names."""
+    renames = {
+        col: COLUMN_ALIASES[col] for col in chunk.columns
+        if col in COLUMN_ALIASES and COLUMN_ALIASES[col] not in chunk.columns
+    }
+    return chunk.rename(columns=renames) if renames else chunk
+
+
+def _columnar_batches(file, chunksize, name):
+    """Record batches of at most ``chunksize`` rows holding only schema columns."""
+    if name.endswith(".parquet"):
+        parquet = pq.ParquetFile(file)
+        columns = [col for col in parquet.schema_arrow.names if col in CSV_DTYPES]
+        yield from parquet.iter_batches(batch_size=chunksize, columns=columns)
+        return
+
+    try:
+        reader = pa.ipc.open_file(file)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        # Arrow IPC stream format rather than the Feather v2 / IPC file format
+        file.seek(0)
+        reader = pa.ipc.open_stream(file)
+        batches = reader
+    columns = [col for col in reader.schema.names if col in CSV_DTYPES]
+    for batch in batches:
+        batch = batch.select(columns)
+        for offset in range(0, batch.num_rows, chunksize):
+            yield batch.slice(offset, chunksize)
+
+
+def _read_columnar_chunks(file, chunksize, name):
+    start = 0
+    for batch in _columnar_batches(file, chunksize, name):
+        chunk = batch.to_pandas()
+        chunk = chunk.astype({col: CSV_DTYPES[col] for col in chunk.columns})
+        # Keep CSV-style row numbers so rejected rows can be located
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
+        yield chunk
+
+
+def validate_columns(df):
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        raise IngestError("CSV columns do not match required format")
+
+
+def preview_records(frame, limit):
+    """First ``limit`` rows of a cleaned frame as JSON-safe records.
+
+    Keys are the upload's column names and values native ints, floats and
+    strings (missing values become None); rejected rows are not shown.
+    """
+    head = frame.head(limit).rename(columns=PREVIEW_COLUMNS).astype(object)
+    return head.where(head.notna(), None).to_dict(orient="records")
+
+
+def _text(series, default=None):
+    values = series.astype("string").str.strip()
+    if default is not None:
+        values = values.fillna(default).replace("", default)
+    return values
+
+
+class SeenIds:
+    """Sorted array of equipment ids already accepted by this upload."""
+
+    def __init__(self, ids=()):
+        self.ids = np.sort(np.asarray(ids, dtype=np.int64))
+
+    def contains(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        pos = np.searchsorted(self.ids, ids).clip(max=max(len(self.ids) - 1, 0))
+        return (self.ids[pos] == ids) if len(self.ids) else np.zeros(len(ids), dtype=bool)
+
+    def add(self, ids):
+        """Merge ``ids`` (not yet in the set) in: one sort of the new ids and a linear insert."""
+        ids = np.sort(np.asarray(ids, dtype=np.int64))
+        self.ids = np.insert(self.ids, np.searchsorted(self.ids, ids), ids)
+
+
+def clean_frame(df, seen=None, max_year=None):
+    """Coerce and range-check a parsed chunk column-wise.
+
+    Returns the valid rows as a frame of Equipment fields and a list of
+    rejected rows, each with its 1-based CSV line number and reasons. Rows
+    whose equipment_id is already in ``seen`` (a ``SeenIds``) are rejected
+    as duplicates; accepted ids are added to it.
+    """
+    max_year = max_year or date.today().year + 1
+
+    equipment_id = pd.to_numeric(df["equipment_id"], errors="coerce")
+    purchase_year = pd.to_numeric(df["purchase_year"], errors="coerce")
+    name = _text(df["equipment_name"])
+    type_ = _text(df["equipment_type"])
+
+    checks = [
+        (equipment_id.isna(), "equipment_id is not a number"),
+        (equipment_id.notna() & ((equipment_id % 1 != 0) | (equipment_id <= 0)),
+         "equipment_id must be a positive integer"),
+        (name.isna() | (name == ""), "equipment_name is empty"),
+        (type_.isna() | (type_ == ""), "equipment_type is empty"),
+        (purchase_year.isna(), "purchase_year is not a number"),
+        (purchase_year.notna() & ((purchase_year % 1 != 0)
+                                  | (purchase_year < MIN_PURCHASE_YEAR)
+                                  | (purchase_year > max_year)),
+         f"purchase_year must be a whole year between {MIN_PURCHASE_YEAR} and {max_year}"),
+    ]
+
+    # Process variables are optional, but a value that is given must be a number
+    process = {}
+    for column in PROCESS_VARIABLES:
+        if column not in df.columns:
+            process[column] = pd.Series(np.nan, index=df.index)
+            continue
+        raw = _text(df[column])
+        process[column] = pd.to_numeric(raw, errors="coerce").astype(float)
+        given = raw.notna() & (raw != "")
+        checks.append((given & ~np.isfinite(process[column]), f"{column} is not a number"))
+    invalid = pd.Series(False, index=df.index)
+    for mask, _ in checks:
+        invalid |= mask.fillna(False).to_numpy(dtype=bool)
+
+    # Duplicate ids, within this chunk and against earlier chunks
+    candidate = ~invalid
+    ids = equipment_id[candidate].astype(np.int64)
+    duplicate = pd.Series(False, index=df.index)
+    duplicate[candidate] = ids.duplicated().to_numpy()
+    if seen is not None and len(ids):
+        duplicate[candidate] |= seen.contains(ids.to_numpy())
+    checks.append((duplicate, "duplicate equipment_id"))
+    invalid |= duplicate
+
+    valid = ~invalid
+    frame = pd.DataFrame({
+        "equipment_id": equipment_id[valid].astype(np.int64),
+        "name": name[valid].astype(object),
+        "type": type_[valid].astype(object),
+        "status": _text(df["status"][valid], "Unknown").astype(object),
+        "location": _text(df["location"][valid], "Unknown").astype(object),
+        "purchase_year": purchase_year[valid].astype(np.int64),
+        "condition": _text(df["condition"][valid], "Unknown").astype(object),
+        **{column: values[valid] for column, values in process.items()},
+    })
+    if seen is not None:
+        seen.add(frame["equipment_id"].to_numpy())
+
+    rejected = []
+    if invalid.any():
+        reasons = pd.DataFrame({reason: mask.fillna(False).to_numpy(dtype=bool) for mask, reason in checks},
+                               index=df.index)[invalid]
+        raw_ids = df["equipment_id"][invalid].astype(object)
+        for index, raw_id, flags in zip(reasons.index, raw_ids, reasons.to_numpy()):
+            rejected.append({
+                "row": int(index) + 2,  # header is line 1
+                "equipment_id": None if pd.isna(raw_id) else raw_id,
+                "reasons": [reason for (_, reason), flag in zip(checks, flags) if flag],
+            })
+    return frame, rejected
+
+
+def upload_sources(path, name):
+    """(path, member, label) for every data file in an upload; ZIPs are expanded."""
+    if not name.lower().endswith(".zip"):
+        return [(path, None, name)]
+    with zipfile.ZipFile(path) as archive:
+        members = [
+            info.filename for info in archive.infolist()
+            if not info.is_dir()
+            and info.filename.lower().endswith(UPLOAD_EXTENSIONS)
+            and not info.filename.startswith("__MACOSX/")
+        ]
+    if not members:
+        raise IngestError(f"{name} contains no CSV, Parquet or Feather files")
+    return [(path, member, f"{name}:{member}") for member in members]
+
+
+def parse_source(path, member, label, chunksize, max_rejected, spool_dir):
+    """Parse and validate one file (optionally a ZIP member) in a worker process.
+
+    The valid rows are pickled chunk by chunk to a spool file in
+    ``spool_dir`` (read back with ``iter_spooled``), so neither the worker
+    nor the caller holds more than a chunk of them. Returns the spool
+    file's path with the per-file report. Duplicate ids are checked within
+    the file here and across files by the caller.
+    """
+    started = time.perf_counter()
+    seen = SeenIds()
+    rejected, preview = [], []
+    rejected_rows = rows_read = 0
+
+    spool_fd, spool_path = tempfile.mkstemp(suffix=".chunks", dir=spool_dir)
+    archive = zipfile.ZipFile(path) if member else None
+    try:
+        file = archive.open(member) if archive else open(path, "rb")
+        with file, os.fdopen(spool_fd, "wb") as spool:
+            for chunk in read_chunks(file, chunksize, member or label):
+                try:
+                    validate_columns(chunk)
+                except IngestError as e:
+                    raise IngestError(f"{label}: {e}") from None
+                frame, chunk_rejected = clean_frame(chunk, seen)
+                if len(preview) < PREVIEW_ROWS:
+                    preview += preview_records(frame, PREVIEW_ROWS - len(preview))
+                pickle.dump(frame, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                rejected_rows += len(chunk_rejected)
+                rejected += chunk_rejected[:max(0, max_rejected - len(rejected))]
+                rows_read += len(chunk)
+    finally:
+        if archive:
+            archive.close()
+
+    for entry in rejected:
+        entry["file"] = label
+    return {
+        "file": label,
+        "spool": spool_path,
+        "rows_read": rows_read,
+        "rejected_rows": rejected_rows,
+        "rejected": rejected,
+        "preview": preview,
+        "parse_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def iter_spooled(path):
+    """The frames ``parse_source`` spooled to ``path``, one at a time."""
+    with open(path, "rb") as spool:
+        while True:
+            try:
+                yield pickle.load(spool)
+            except EOFError:
+                return
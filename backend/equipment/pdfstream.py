@@ -0,0 +1,220 @@
+# backend/equipment/pdfstream.py
+"""A PDF writer that emits each page as soon as it is finished.
+
+reportlab's Canvas keeps every page in memory until ``save()``, so a report
+of many thousand pages is only sent once all of it has been built. The
+StreamingCanvas below implements the subset of the Canvas API the reports
+use, but writes a page's objects to its file when ``showPage()`` is called
+and only keeps their byte offsets for the cross-reference table written by
+``save()``. The page tree object is numbered up front and written last,
+which PDF allows, so pages never have to be revisited.
+
+Text is set in the standard Type 1 fonts (no embedding) with WinAnsi
+encoding; glyph widths come from reportlab's font metrics.
+"""
+import zlib
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+# Standard fonts every page can use -> resource name
+FONTS = {
+    "Helvetica": "F1",
+    "Helvetica-Bold": "F2",
+    "Helvetica-Oblique": "F3",
+    "Courier": "F4",
+}
+
+CATALOG, PAGES = 1, 2
+
+# Characters escaped in PDF literal strings
+_ESCAPES = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)", "\r": "\\r", "\n": "\\n"})
+
+
+def _number(value):
+    """A PDF number (PDF has no exponent notation)."""
+    if isinstance(value, int):
+        return str(value)
+    return f"{value:.2f}"
+
+
+def _string(text):
+    """A PDF literal string in WinAnsi encoding."""
+    return b"(" + str(text).translate(_ESCAPES).encode("cp1252", "replace") + b")"
+
+
+class ChunkBuffer:
+    """Write-only file-like sink whose contents are collected with ``drain()``.
+
+    Lets a writer that expects a file feed a streaming response: whatever
+    was written since the last ``drain()`` is handed over and forgotten.
+    """
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0       # bytes not drained yet
+        self.position = 0   # bytes written in total
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks, self.size = [], 0
+        return data
+
+
+class StreamingCanvas:
+    """Canvas-compatible PDF writer that flushes every finished page."""
+
+    def __init__(self, file, pagesize=A4, title=""):
+        self.file = file
+        self.pagesize = pagesize
+        self.title = title
+        self.offsets = {}
+        self.page_ids = []
+        self.position = 0
+        self.next_id = PAGES + 1
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.font_ids = {}
+        for font, name in FONTS.items():
+            self.font_ids[name] = self._add_object(
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{font} /Encoding /WinAnsiEncoding >>".encode()
+            )
+        self._reset_page()
+
+    def _write(self, data):
+        self.file.write(data)
+        self.position += len(data)
+
+    def _reserve(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def _add_object(self, body, object_id=None):
+        object_id = object_id or self._reserve()
+        self.offsets[object_id] = self.position
+        self._write(f"{object_id} 0 obj\n".encode() + body + b"\nendobj\n")
+        return object_id
+
+    def _reset_page(self):
+        self.ops = []
+        self.images = {}
+        self.font = ("Helvetica", 12)
+
+    # Graphics state
+
+    def setFont(self, name, size):
+        self.font = (name, size)
+
+    def setFillColorRGB(self, r, g, b):
+        self.ops.append(f"{_number(r)} {_number(g)} {_number(b)} rg".encode())
+
+    def setStrokeColorRGB(self, r, g, b):
+        self.ops.append(f"{_number(r)} {_number(g)} {_number(b)} RG".encode())
+
+    def setLineWidth(self, width):
+        self.ops.append(f"{_number(width)} w".encode())
+
+    def stringWidth(self, text, name=None, size=None):
+        return stringWidth(str(text), name or self.font[0], size or self.font[1])
+
+    # Drawing
+
+    def drawString(self, x, y, text):
+        name, size = self.font
+        self.ops.append(
+            f"BT /{FONTS[name]} {_number(size)} Tf {_number(x)} {_number(y)} Td ".encode()
+            + _string(text) + b" Tj ET"
+        )
+
+    def drawRightString(self, x, y, text):
+        self.drawString(x - self.stringWidth(text), y, text)
+
+    def drawCentredString(self, x, y, text):
+        self.drawString(x - self.stringWidth(text) / 2, y, text)
+
+    def line(self, x1, y1, x2, y2):
+        self.ops.append(f"{_number(x1)} {_number(y1)} m {_number(x2)} {_number(y2)} l S".encode())
+
+    def rect(self, x, y, width, height, stroke=1, fill=0):
+        paint = {(1, 0): "S", (0, 1): "f", (1, 1): "B"}.get((bool(stroke), bool(fill)), "n")
+        self.ops.append(
+            f"{_number(x)} {_number(y)} {_number(width)} {_number(height)} re {paint}".encode()
+        )
+
+    def drawImage(self, image, x, y, width, height):
+        """Draw an image file (anything reportlab's ImageReader reads) scaled to the box.
+
+        The pixels are written out at once as an image XObject, so the page
+        keeps only a reference to them.
+        """
+        reader = ImageReader(image)
+        pixels_wide, pixels_high = reader.getSize()
+        data = zlib.compress(reader.getRGBData())
+        image_id = self._add_object(
+            f"<< /Type /XObject /Subtype /Image /Width {pixels_wide} /Height {pixels_high} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode "
+            f"/Length {len(data)} >>\nstream\n".encode() + data + b"\nendstream"
+        )
+        name = f"Im{image_id}"
+        self.images[name] = image_id
+        self.ops.append(
+            f"q {_number(width)} 0 0 {_number(height)} {_number(x)} {_number(y)} cm /{name} Do Q".encode()
+        )
+
+    # Pages
+
+    def getPageNumber(self):
+        return len(self.page_ids) + 1
+
+    def showPage(self):
+        """Finish the current page and write it out."""
+        content = zlib.compress(b"\n".join(self.ops))
+        content_id = self._add_object(
+            f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode()
+            + content + b"\nendstream"
+        )
+        fonts = " ".join(f"/{name} {object_id} 0 R" for name, object_id in self.font_ids.items())
+        images = " ".join(f"/{name} {object_id} 0 R" for name, object_id in self.images.items())
+        width, height = self.pagesize
+        self.page_ids.append(self._add_object(
+            f"<< /Type /Page /Parent {PAGES} 0 R /MediaBox [0 0 {_number(width)} {_number(height)}] "
+            f"/Resources << /Font << {fonts} >> /XObject << {images} >> >> "
+            f"/Contents {content_id} 0 R >>".encode()
+        ))
+        self._reset_page()
+
+    def save(self):
+        """Write the page tree, catalog and cross-reference table."""
+        if self.ops or not self.page_ids:
+            self.showPage()
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._add_object(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode(), PAGES)
+        self._add_object(f"<< /Type /Catalog /Pages {PAGES} 0 R >>".encode(), CATALOG)
+        info_id = self._add_object(b"<< /Title " + _string(self.title) + b" /Producer (equipment) >>")
+
+        xref_offset = self.position
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[object_id]:010d} 00000 n \n" for object_id in range(1, self.next_id)]
+        self._write("".join(lines).encode())
+        self._write(
+            f"trailer\n<< /Size {self.next_id} /Root {CATALOG} 0 R /Info {info_id} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode()
+        )
@@ -0,0 +1,138 @@
+# backend/equipment/renderers.py
+"""Fast API renderers, picked from the request's Accept header.
+
+- ORJSONRenderer (application/json) encodes with orjson, which writes
+  NumPy arrays and scalars itself instead of going through a Python-level
+  encoder; it falls back to DRF's JSONRenderer without orjson.
+- MessagePackRenderer (application/msgpack) for compact binary responses.
+- ArrowIPCRenderer (application/vnd.apache.arrow.stream) turns the rows of
+  a response into one Arrow record batch stream that clients read straight
+  into a DataFrame.
+
+The renderers in use are listed in REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"];
+the binary ones are only listed there when their library is installed.
+"""
+import datetime
+import decimal
+import json
+import uuid
+
+import numpy as np
+import pandas as pd
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+from .parsing import pa
+
+try:
+    import orjson
+except ImportError:  # plain json via DRF's encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Schema metadata key of an Arrow stream holding the response's non-row fields as JSON
+ARROW_METADATA_KEY = b"equipment"
+
+
+def default(obj):
+    """Values the fast encoders have no native form for."""
+    if obj is None or obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, (decimal.Decimal, uuid.UUID, Promise)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict(orient="list")
+    if isinstance(obj, pd.Series):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON with orjson: NumPy values natively, NaN as null."""
+
+    options = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        options = self.options
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=default, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=default, use_bin_type=True, datetime=False)
+
+
+def arrow_table(data):
+    """Arrow table of the rows of a response.
+
+    Row lists and DataFrames become tables as they are; a dict with
+    ``columns`` (cube) or ``results`` (listing) is tabled on those and its
+    other keys go to the schema metadata. Any other dict is one row.
+    """
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    if isinstance(data, list):
+        return pa.Table.from_pylist(data)
+    if isinstance(data, dict) and isinstance(data.get("columns"), dict):
+        table = pa.table(data["columns"])
+        rest = {key: value for key, value in data.items() if key != "columns"}
+    elif isinstance(data, dict) and isinstance(data.get("results"), list):
+        table = pa.Table.from_pylist(data["results"])
+        rest = {key: value for key, value in data.items() if key != "results"}
+    else:
+        row = {
+            key: value.tolist() if isinstance(value, np.ndarray) and value.ndim > 1 else value
+            for key, value in (data or {}).items()
+        }
+        return pa.Table.from_pylist([row])
+    metadata = json.dumps(rest, default=default).encode()
+    return table.replace_schema_metadata({ARROW_METADATA_KEY: metadata})
+
+
+class ArrowIPCRenderer(BaseRenderer):
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        table = arrow_table(data)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+def data_renderers():
+    """The configured renderers that encode data (all but the browsable API)."""
+    return [renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer.format != "api"]
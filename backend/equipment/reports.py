@@ -0,0 +1,347 @@
+# backend/equipment/reports.py
+"""PDF reports rendered once per dataset version and kept under MEDIA_ROOT.
+
+A dataset's version is the time it was last written, so a report file is
+never invalidated explicitly: a new upload (incremental ones included,
+which make a new dataset) simply names a new file, and the old one of a
+dataset is removed.
+
+The full report adds a table of every equipment row. It is not stored:
+it is drawn with pdfstream.StreamingCanvas while the rows are read and
+sent to the client page by page.
+"""
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+
+from .charts import CHART_SIZE, cached_chart, charts_enabled, delete_charts, density_chart, type_chart
+from .filters import filter_columns, filter_frame
+from .models import Dataset
+from .pdfstream import ChunkBuffer, StreamingCanvas
+from .snapshots import load_snapshot
+from .summary import empty_summary
+
+# Bumped when the report layout changes, so files rendered by older code are not served
+REPORT_LAYOUT = 3
+
+# Process variables in the PDF report: (label, summary field, unit)
+PROCESS_VARIABLE_LABELS = [
+    ("Flowrate", "flowrate", "L/min"),
+    ("Pressure", "pressure", "bar"),
+    ("Temperature", "temperature", "°C"),
+]
+
+
+def reports_dir():
+    return os.path.join(settings.MEDIA_ROOT, "reports")
+
+
+def dataset_version(dataset):
+    """Version of ``dataset``'s contents (0 before the first upload)."""
+    return int(dataset.updated_at.timestamp() * 1_000_000) if dataset is not None else 0
+
+
+def report_name(dataset):
+    # Reports with and without charts differ, so toggling them names a new file
+    layout = f"v{REPORT_LAYOUT}" + ("" if charts_enabled() else "-text")
+    if dataset is None:
+        return f"empty-{layout}.pdf"
+    return f"dataset-{dataset.pk}-{dataset_version(dataset)}-{layout}.pdf"
+
+
+def report_key(dataset):
+    return os.path.splitext(report_name(dataset))[0]
+
+
+def report_etag(dataset):
+    return f'"{report_key(dataset)}"'
+
+
+def report_path(dataset):
+    return os.path.join(reports_dir(), report_name(dataset))
+
+
+# Columns of the detail table in full reports: (header, field, width, right-aligned)
+DETAIL_COLUMNS = [
+    ("ID", "equipment_id", 38, True),
+    ("Name", "name", 100, False),
+    ("Type", "type", 72, False),
+    ("Status", "status", 50, False),
+    ("Location", "location", 55, False),
+    ("Year", "purchase_year", 30, True),
+    ("Condition", "condition", 45, False),
+    ("Flow", "flowrate", 40, True),
+    ("Pressure", "pressure", 40, True),
+    ("Temp", "temperature", 40, True),
+]
+DETAIL_FONT = ("Helvetica", 7)
+DETAIL_ROW_HEIGHT = 10
+
+
+def get_report_chunk_size():
+    """Equipment rows fetched per query round trip while drawing a full report."""
+    return getattr(settings, "EQUIPMENT_REPORT_CHUNK_SIZE", 2000)
+
+
+@lru_cache(maxsize=8192)
+def text_width(text, font=DETAIL_FONT):
+    return stringWidth(text, *font)
+
+
+@lru_cache(maxsize=4096)
+def fit_text(text, width, font=DETAIL_FONT):
+    """``text`` shortened with an ellipsis to fit ``width`` points."""
+    if text_width(text, font) <= width:
+        return text
+    while text and text_width(text + "...", font) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def format_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    return str(value)
+
+
+class ReportLayout:
+    """Flows lines and table rows down the pages of a canvas.
+
+    Starts a new page whenever the next line would not fit, numbering the
+    pages and repeating the header of a table that runs across pages.
+    Works with reportlab's Canvas and with pdfstream.StreamingCanvas.
+    """
+
+    top_margin = 50
+    bottom_margin = 50
+    left = 50
+
+    def __init__(self, canvas, title="Equipment Report"):
+        self.canvas = canvas
+        self.title = title
+        self.width, self.height = A4
+        self.y = self.height - self.top_margin
+        self.columns = None
+
+    def ensure(self, space):
+        """Start a new page unless ``space`` points are left on this one."""
+        if self.y - space < self.bottom_margin:
+            self.new_page()
+
+    def new_page(self):
+        self._footer()
+        self.canvas.showPage()
+        self.y = self.height - self.top_margin
+        if self.columns is not None:
+            self._table_header()
+
+    def _footer(self):
+        self.canvas.setFont("Helvetica", 8)
+        self.canvas.drawRightString(
+            self.width - self.left, self.bottom_margin / 2,
+            f"{self.title} - page {self.canvas.getPageNumber()}",
+        )
+
+    def text(self, text, font="Helvetica", size=12, indent=0, space=20):
+        """Draw a line ``space`` points below the previous one."""
+        self.ensure(space)
+        self.y -= space
+        self.canvas.setFont(font, size)
+        self.canvas.drawString(self.left + indent, self.y, text)
+
+    def heading(self, text, size=14):
+        # Keep a heading on the same page as at least two of its lines
+        self.ensure(40 + 3 * 20)
+        self.text(text, "Helvetica-Bold", size, space=40)
+        self.y -= 10
+
+    def start_table(self, columns):
+        """Begin a table of ``(header, field, width, right-aligned)`` columns."""
+        self.columns = columns
+        self.ensure(3 * DETAIL_ROW_HEIGHT)
+        self._table_header()
+
+    def _table_header(self):
+        self.y -= DETAIL_ROW_HEIGHT + 2
+        header_font = ("Helvetica-Bold", DETAIL_FONT[1])
+        self.canvas.setFont(*header_font)
+        self._cells([header for header, _, _, _ in self.columns], header_font)
+        self.canvas.setLineWidth(0.5)
+        self.canvas.line(self.left, self.y - 3, self.width - self.left, self.y - 3)
+        self.y -= 4
+        self.canvas.setFont(*DETAIL_FONT)
+
+    def _cells(self, values, font=DETAIL_FONT):
+        x = self.left
+        for value, (_, _, width, right) in zip(values, self.columns):
+            if right:
+                self.canvas.drawString(x + width - 4 - text_width(value, font), self.y, value)
+            else:
+                self.canvas.drawString(x, self.y, fit_text(value, width - 4, font))
+            x += width
+
+    def table_row(self, values):
+        """Draw one row of already formatted cell values."""
+        if self.y - DETAIL_ROW_HEIGHT < self.bottom_margin:
+            self.new_page()
+        self.y -= DETAIL_ROW_HEIGHT
+        self._cells(values)
+
+    def end_table(self):
+        self.columns = None
+
+    def finish(self):
+        self._footer()
+        self.canvas.showPage()
+
+
+def report_charts(dataset, summary, filters=None):
+    """Paths of the chart images of a report, rendered on first use.
+
+    Charts are cached under the report's key (plus the filters, for
+    filtered full reports), so each is drawn once per dataset version.
+    """
+    if dataset is None or not charts_enabled():
+        return []
+    key = report_key(dataset)
+    if filters:
+        key += "-" + hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+    def types():
+        return type_chart(summary["type_distribution"]) if summary["type_distribution"] else None
+
+    def density():
+        columns = ["pressure", "temperature", *filter_columns(filters or {})]
+        frame = filter_frame(load_snapshot(dataset, columns=columns), filters or {})
+        return density_chart(frame["pressure"].to_numpy(dtype=float), frame["temperature"].to_numpy(dtype=float))
+
+    paths = [cached_chart(key, "types", types), cached_chart(key, "density", density)]
+    return [path for path in paths if path is not None]
+
+
+def draw_charts(layout, paths):
+    """Draw chart images the full width of the page, one below the other."""
+    width = layout.width - 2 * layout.left
+    height = width * CHART_SIZE[1] / CHART_SIZE[0]
+    for path in paths:
+        layout.ensure(height + 20)
+        layout.y -= height + 20
+        layout.canvas.drawImage(path, layout.left, layout.y, width, height)
+
+
+def draw_summary(layout, dataset, summary, charts=()):
+    """Title, totals, distributions and charts of the report."""
+    layout.text("Equipment Report", "Helvetica-Bold", 16, space=0)
+    layout.y -= 20
+
+    if dataset is not None:
+        layout.text(f"Dataset: {dataset.name} (#{dataset.pk})")
+    layout.text(f"Total Equipment: {summary['total_equipment']}")
+    layout.text(f"Average Purchase Year: {summary['avg_purchase_year']}")
+    if summary["min_purchase_year"] is not None:
+        layout.text(f"Purchase Years: {summary['min_purchase_year']} - {summary['max_purchase_year']}")
+    for label, field, unit in PROCESS_VARIABLE_LABELS:
+        if summary[f"avg_{field}"] is not None:
+            layout.text(
+                f"Average {label}: {summary[f'avg_{field}']} {unit} "
+                f"(range {summary[f'min_{field}']} - {summary[f'max_{field}']})"
+            )
+
+    layout.heading("Equipment Type Distribution")
+    for type_, count in summary["type_distribution"].items():
+        layout.text(f"{type_}: {count}", indent=10)
+
+    if charts:
+        layout.heading("Charts")
+        draw_charts(layout, charts)
+
+
+def draw_report(file, dataset, summary):
+    """Write the summary report of ``dataset`` (None: nothing uploaded) to ``file``."""
+    p = canvas.Canvas(file, pagesize=A4)
+    layout = ReportLayout(p)
+    draw_summary(layout, dataset, summary, report_charts(dataset, summary))
+    layout.finish()
+    p.save()
+
+
+def iter_full_report(dataset, summary, queryset, filters=None):
+    """The summary report plus a table of every row of ``queryset``, as PDF chunks.
+
+    Rows are read with ``iterator()`` and every page is yielded as soon as
+    it is complete, so memory use does not grow with the row count.
+    """
+    buffer = ChunkBuffer()
+    layout = ReportLayout(StreamingCanvas(buffer, pagesize=A4, title="Equipment Report"))
+    draw_summary(layout, dataset, summary, report_charts(dataset, summary, filters))
+
+    layout.heading("Equipment Details")
+    layout.start_table(DETAIL_COLUMNS)
+    rows = queryset.order_by("equipment_id").values_list(*(field for _, field, _, _ in DETAIL_COLUMNS))
+    for row in rows.iterator(chunk_size=get_report_chunk_size()):
+        layout.table_row([format_cell(value) for value in row])
+        if buffer.size:
+            yield buffer.drain()
+    layout.end_table()
+
+    layout.finish()
+    layout.canvas.save()
+    yield buffer.drain()
+
+
+def get_report(dataset):
+    """Path of ``dataset``'s report for its current version, rendering it if needed.
+
+    The file is written under a temporary name and moved into place, so
+    concurrent requests never serve a partial report.
+    """
+    path = report_path(dataset)
+    if os.path.exists(path):
+        return path
+
+    summary = dataset.summary.as_dict() if dataset is not None else empty_summary()
+    os.makedirs(reports_dir(), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=reports_dir(), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            draw_report(file, dataset, summary)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    if dataset is not None:
+        # Reports and charts of older versions of this dataset are never served again
+        delete_reports(dataset.pk, keep=report_key(dataset))
+    return path
+
+
+def delete_reports(dataset_id, keep=None):
+    """Remove the rendered reports and charts of a dataset (except those of report key ``keep``)."""
+    for path in glob.glob(os.path.join(reports_dir(), f"dataset-{dataset_id}-*.pdf")):
+        if keep is None or not os.path.basename(path).startswith(keep):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    delete_charts(dataset_id, keep)
+
+
+def prerender_enabled():
+    return getattr(settings, "EQUIPMENT_PRERENDER_REPORTS", True)
+
+
+def prerender_report(dataset_id):
+    """Render a freshly ingested dataset's report so the first download is a file serve."""
+    datasets = Dataset.objects.select_related("summary").defer("preview", "summary__sketches")
+    get_report(datasets.get(pk=dataset_id))
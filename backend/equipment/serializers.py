@@ -0,0 +1,174 @@
+# backend/equipment/serializers.py
+from rest_framework import serializers
+
+from .jobs import get_progress
+from .cube import DIMENSIONS, parse_measure
+from .export import COMPRESSIONS, FORMATS
+from .histograms import HISTOGRAM_FIELDS, MAX_BINS, METHODS
+from .models import Dataset, IngestJob
+from .parsing import MODEL_FIELDS, pa
+
+
+class DatasetSerializer(serializers.ModelSerializer):
+    stats = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Dataset
+        fields = [
+            'id',
+            'name',
+            'content_hash',
+            'mode',
+            'row_count',
+            'stats',
+            'created_at',
+            'updated_at',
+        ]
+
+    def get_stats(self, dataset):
+        summary = getattr(dataset, 'summary', None)
+        return summary.as_dict() if summary is not None else None
+
+
+class DatasetDetailSerializer(DatasetSerializer):
+    class Meta(DatasetSerializer.Meta):
+        fields = DatasetSerializer.Meta.fields + ['preview']
+
+
+class CommaSeparatedField(serializers.CharField):
+    """Query parameter holding one or more comma-separated values."""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        return [part.strip() for part in value.split(",") if part.strip()]
+
+
+class EquipmentFilterSerializer(serializers.Serializer):
+    """Validates the row filters accepted by the read endpoints."""
+    type = CommaSeparatedField(required=False)
+    status = CommaSeparatedField(required=False)
+    location = CommaSeparatedField(required=False)
+    purchase_year_min = serializers.IntegerField(required=False)
+    purchase_year_max = serializers.IntegerField(required=False)
+
+    def validate(self, attrs):
+        low, high = attrs.get("purchase_year_min"), attrs.get("purchase_year_max")
+        if low is not None and high is not None and low > high:
+            raise serializers.ValidationError("purchase_year_min must not exceed purchase_year_max")
+        return attrs
+
+
+def check_model_fields(value):
+    """Distinct Equipment fields named in ``value`` (a list), in order."""
+    unknown = [field for field in value if field not in MODEL_FIELDS]
+    if unknown:
+        raise serializers.ValidationError(
+            f"Unknown field(s): {', '.join(unknown)}. Choose from {', '.join(MODEL_FIELDS)}"
+        )
+    return list(dict.fromkeys(value))
+
+
+class EquipmentListQuerySerializer(EquipmentFilterSerializer):
+    """Query parameters of /api/equipment/: filters, keyset cursor and projection."""
+    after = serializers.IntegerField(required=False)   # last equipment_id of the previous page
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=1000, default=100)
+    fields = CommaSeparatedField(required=False)
+
+    def validate_fields(self, value):
+        value = check_model_fields(value)
+        # The cursor key is always returned
+        return ["equipment_id"] + [field for field in value if field != "equipment_id"]
+
+
+class ExportQuerySerializer(EquipmentFilterSerializer):
+    """Query parameters of /api/export/: file format, compression, projection and row filters."""
+    format = serializers.ChoiceField(choices=list(FORMATS), default="csv")
+    compression = serializers.ChoiceField(choices=COMPRESSIONS, default="none")
+    fields = CommaSeparatedField(required=False)
+
+    def validate_fields(self, value):
+        if not value:
+            raise serializers.ValidationError("Give one or more fields")
+        return check_model_fields(value)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs["format"] == "parquet" and pa is None:
+            raise serializers.ValidationError({"format": "Parquet export needs pyarrow installed"})
+        return attrs
+
+
+class CubeQuerySerializer(EquipmentFilterSerializer):
+    """Query parameters of /api/cube/: dimensions, measures and row filters."""
+    dims = CommaSeparatedField()
+    measures = CommaSeparatedField(required=False, default=["count"])
+
+    def validate_dims(self, value):
+        unknown = [dim for dim in value if dim not in DIMENSIONS]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown dimension(s): {', '.join(unknown)}. Choose from {', '.join(DIMENSIONS)}"
+            )
+        if not value or len(set(value)) != len(value):
+            raise serializers.ValidationError("Give one or more distinct dimensions")
+        return value
+
+    def validate_measures(self, value):
+        for measure in value:
+            try:
+                parse_measure(measure)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
+        return list(dict.fromkeys(value)) or ["count"]
+
+
+class HistogramQuerySerializer(EquipmentFilterSerializer):
+    """Query parameters of /api/histogram/: field(s), binning and row filters."""
+    x = serializers.ChoiceField(choices=list(HISTOGRAM_FIELDS))
+    y = serializers.ChoiceField(choices=list(HISTOGRAM_FIELDS), required=False)   # 2D histogram
+    method = serializers.ChoiceField(choices=METHODS, default="fixed")
+    bins = serializers.IntegerField(min_value=1, max_value=MAX_BINS, default=20)
+    width = serializers.FloatField(min_value=0, required=False)   # fixed-width bins of this size
+    min = serializers.FloatField(required=False)
+    max = serializers.FloatField(required=False)
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if attrs.get("width") == 0:
+            raise serializers.ValidationError({"width": "Must be greater than 0"})
+        if "y" in attrs and ("min" in attrs or "max" in attrs):
+            raise serializers.ValidationError("min/max only apply to 1D histograms")
+        if attrs.get("min") is not None and attrs.get("max") is not None and attrs["min"] > attrs["max"]:
+            raise serializers.ValidationError("min must not exceed max")
+        return attrs
+
+
+class UploadOptionsSerializer(serializers.Serializer):
+    """Form fields of /api/upload/ besides the files, checked before a job is queued."""
+    wait = serializers.BooleanField(required=False, default=False)   # ingest in the request
+    chunk_size = serializers.IntegerField(required=False, min_value=1)
+    batch_size = serializers.IntegerField(required=False, min_value=1)
+
+
+class IngestJobSerializer(serializers.ModelSerializer):
+    rows_processed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = IngestJob
+        fields = [
+            'id',
+            'file_name',
+            'mode',
+            'status',
+            'content_hash',
+            'dataset',
+            'rows_processed',
+            'errors',
+            'result',
+            'created_at',
+            'started_at',
+            'finished_at',
+        ]
+
+    def get_rows_processed(self, job):
+        return get_progress(job)
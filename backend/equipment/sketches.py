@@ -0,0 +1,180 @@
+# backend/equipment/sketches.py
+"""KLL quantile sketches (Karnin, Lang & Liberty, 2016) built at ingest time.
+
+A sketch keeps a few hundred of the values it has seen, arranged in levels;
+an item at level h stands for 2**h input values. When a level outgrows its
+capacity it is sorted and every other item (from a random offset) moves up
+a level. Sketches of disjoint inputs merge by concatenating their levels, so
+chunks, files and workers can be summarised independently and combined.
+
+With k=200 a quantile returned by the sketch has a true rank within
+RANK_ERROR (1.65% of the row count) of the one asked for, with 99%
+confidence - e.g. the reported p95 lies between the true p93.35 and
+p96.65. Answering a quantile costs O(k), however many rows were seen.
+"""
+import math
+
+import numpy as np
+
+from .parsing import NUMERIC_FIELDS
+
+DEFAULT_K = 200
+
+# Normalized rank error of a k=200 sketch (99% confidence)
+RANK_ERROR = 0.0165
+
+# Capacity of each level relative to the one above it
+CAPACITY_DECAY = 2 / 3
+
+# Percentiles precomputed for the summary API
+PERCENTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+
+class KLLSketch:
+    """Mergeable quantile sketch of a stream of numbers."""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.n = 0
+        self.min = self.max = None
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng()
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * CAPACITY_DECAY ** depth))
+
+    def update(self, values):
+        """Add an array of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self._observe(len(values), values.min(), values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        """Fold ``other`` (a sketch of different rows) into this sketch."""
+        if not other.n:
+            return
+        self._observe(other.n, other.min, other.max)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def _observe(self, count, low, high):
+        self.n += count
+        self.min = float(low) if self.min is None else min(self.min, float(low))
+        self.max = float(high) if self.max is None else max(self.max, float(high))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind; the pairs above it are halved
+                kept, pairs = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def quantiles(self, fractions):
+        """Approximate values at each rank fraction in ``fractions`` (0..1)."""
+        if not self.n:
+            return [None for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(len(level_items), 2.0 ** level) for level, level_items in enumerate(self.levels)
+        ])
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        result = []
+        for fraction in fractions:
+            if fraction <= 0:
+                result.append(self.min)
+            elif fraction >= 1:
+                result.append(self.max)
+            else:
+                index = min(np.searchsorted(cumulative, fraction * self.n), len(items) - 1)
+                result.append(float(items[index]))
+        return result
+
+    def quantile(self, fraction):
+        return self.quantiles([fraction])[0]
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min,
+            "max": self.max,
+            "levels": [items.tolist() for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["k"])
+        sketch.n, sketch.min, sketch.max = data["n"], data["min"], data["max"]
+        sketch.levels = [np.asarray(items, dtype=float) for items in data["levels"]]
+        return sketch
+
+
+class EquipmentSketches:
+    """KLL sketches of every numeric field, overall and per equipment type."""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.overall = {field: KLLSketch(k) for field in NUMERIC_FIELDS}
+        self.by_type = {}
+
+    def update(self, frame):
+        """Add the rows of a cleaned frame."""
+        if not len(frame):
+            return
+        groups = frame.groupby("type", observed=True).indices
+        for field in NUMERIC_FIELDS:
+            values = frame[field].to_numpy(dtype=float)
+            self.overall[field].update(values)
+            for type_, rows in groups.items():
+                sketches = self.by_type.setdefault(
+                    str(type_), {name: KLLSketch(self.k) for name in NUMERIC_FIELDS}
+                )
+                sketches[field].update(values[rows])
+
+    def merge(self, other):
+        for field, sketch in other.overall.items():
+            self.overall[field].merge(sketch)
+        for type_, sketches in other.by_type.items():
+            mine = self.by_type.setdefault(type_, {name: KLLSketch(self.k) for name in NUMERIC_FIELDS})
+            for field, sketch in sketches.items():
+                mine[field].merge(sketch)
+
+    @staticmethod
+    def _percentiles(sketches):
+        return {
+            field: dict(zip(PERCENTILES, sketch.quantiles(PERCENTILES.values())))
+            for field, sketch in sketches.items()
+        }
+
+    def percentiles(self):
+        """Precomputed percentiles: ``{"overall": {field: {"p50": ...}}, "by_type": {...}}``."""
+        return {
+            "overall": self._percentiles(self.overall),
+            "by_type": {type_: self._percentiles(sketches) for type_, sketches in self.by_type.items()},
+        }
+
+    def to_dict(self):
+        return {
+            "overall": {field: sketch.to_dict() for field, sketch in self.overall.items()},
+            "by_type": {
+                type_: {field: sketch.to_dict() for field, sketch in sketches.items()}
+                for type_, sketches in self.by_type.items()
+            },
+        }
@@ -0,0 +1,92 @@
+# backend/equipment/snapshots.py
+"""Columnar (Parquet) snapshots of ingested datasets under MEDIA_ROOT.
+
+Re-analysis, exports and reports can read typed columns from the snapshot
+instead of re-parsing the upload or querying the ORM row by row.
+"""
+import os
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from .parsing import MODEL_FIELDS, pa, pq
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ("equipment_id", pa.int64()),
+    ("name", pa.string()),
+    ("type", pa.string()),
+    ("status", pa.string()),
+    ("location", pa.string()),
+    ("purchase_year", pa.int64()),
+    ("condition", pa.string()),
+    ("flowrate", pa.float64()),
+    ("pressure", pa.float64()),
+    ("temperature", pa.float64()),
+]) if pa is not None else None
+
+
+def snapshots_enabled():
+    return pa is not None and getattr(settings, "EQUIPMENT_SNAPSHOTS", True)
+
+
+def snapshot_path(dataset_id):
+    return os.path.join(settings.MEDIA_ROOT, "snapshots", f"dataset-{dataset_id}.parquet")
+
+
+class SnapshotWriter:
+    """Write cleaned frames of one dataset to Parquet, one row group per frame.
+
+    The file is written to a temporary path and moved into place when the
+    writer closes (once the transaction commits, if one is open then).
+    """
+
+    def __init__(self, dataset_id):
+        self.path = snapshot_path(dataset_id)
+        self.tmp_path = f"{self.path}.tmp"
+        self.writer = None
+
+    def __enter__(self):
+        if snapshots_enabled():
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.writer = pq.ParquetWriter(self.tmp_path, SNAPSHOT_SCHEMA)
+        return self
+
+    def write(self, frame):
+        if self.writer is not None and len(frame):
+            table = pa.Table.from_pandas(frame, schema=SNAPSHOT_SCHEMA, preserve_index=False)
+            self.writer.write_table(table)
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.writer is None:
+            return
+        self.writer.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+        else:
+            transaction.on_commit(lambda: os.replace(self.tmp_path, self.path))
+
+
+def load_snapshot(dataset, columns=None):
+    """Typed columns of ``dataset`` as a DataFrame.
+
+    Reads the Parquet snapshot when there is one and falls back to the ORM
+    (one values_list() pass) for datasets ingested without a snapshot.
+    """
+    path = snapshot_path(dataset.pk)
+    if pq is not None and os.path.exists(path):
+        # Snapshots written before a column existed lack it; it reads as missing
+        available = pq.read_schema(path).names
+        wanted = columns or available
+        frame = pq.read_table(path, columns=[col for col in wanted if col in available]).to_pandas()
+        return frame.reindex(columns=wanted)
+
+    fields = columns or MODEL_FIELDS
+    rows = dataset.equipment.order_by("pk").values_list(*fields).iterator(chunk_size=10000)
+    return pd.DataFrame.from_records(rows, columns=fields)
+
+
+def delete_snapshot(dataset_id):
+    path = snapshot_path(dataset_id)
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,132 @@
+# backend/equipment/summary.py
+from collections import Counter
+
+from django.db.models import Count, F, Max, Min, Sum
+
+from .analytics import RunningStats
+from .models import DatasetSummary
+from .parsing import PROCESS_VARIABLES
+from .sketches import EquipmentSketches
+
+# Columns counted per distinct value -> DatasetSummary field holding the counts
+COUNT_FIELDS = {
+    "type": "type_counts",
+    "status": "status_counts",
+    "location": "location_counts",
+    "condition": "condition_counts",
+}
+
+
+class SummaryAccumulator:
+    """Running counters and quantile sketches behind a DatasetSummary.
+
+    Every dataset (incremental versions included) is written in full, so
+    its summary is built up as its rows are: frames of cleaned rows are
+    added column-wise and the table is never rescanned.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.year_sum = 0
+        self.year_counts = Counter()
+        self.counts = {attr: Counter() for attr in COUNT_FIELDS.values()}
+        self.process = {field: RunningStats() for field in PROCESS_VARIABLES}
+        self.sketches = EquipmentSketches()
+
+    def add(self, frame):
+        """Count the rows of ``frame`` and feed them to the quantile sketches."""
+        if not len(frame):
+            return
+        self.total += len(frame)
+        years = frame["purchase_year"]
+        self.year_sum += int(years.sum())
+        for year, count in years.value_counts().items():
+            self.year_counts[int(year)] += int(count)
+        for field, attr in COUNT_FIELDS.items():
+            for value, count in frame[field].value_counts().items():
+                self.counts[attr][str(value)] += int(count)
+        for field, stats in self.process.items():
+            stats.merge(RunningStats().update(frame[field]))
+        self.sketches.update(frame)
+
+    def save(self, dataset):
+        """Write the counters to ``dataset``'s summary row and return it."""
+        years = {year: count for year, count in self.year_counts.items() if count > 0}
+        summary, _ = DatasetSummary.objects.update_or_create(
+            dataset=dataset,
+            defaults={
+                "total": self.total,
+                "purchase_year_sum": self.year_sum,
+                "purchase_year_min": min(years, default=None),
+                "purchase_year_max": max(years, default=None),
+                "year_counts": {str(year): years[year] for year in sorted(years)},
+                "process_stats": self.process_stats(),
+                "sketches": self.sketches.to_dict(),
+                "percentiles": self.sketches.percentiles(),
+                **{
+                    attr: {value: count for value, count in counts.most_common() if count > 0}
+                    for attr, counts in self.counts.items()
+                },
+            },
+        )
+        return summary
+
+    def process_stats(self):
+        """Running count/mean/variance and min/max of each process variable."""
+        return {field: stats.to_dict() for field, stats in self.process.items()}
+
+
+def empty_summary():
+    """Summary payload before anything was uploaded."""
+    return DatasetSummary().as_dict()
+
+
+def aggregate_summary(queryset):
+    """Summary of an Equipment queryset computed by one grouped query.
+
+    Rows are grouped by every distribution column at once; the total,
+    averages and ranges are then derived from the groups in Python.
+    Returns the summary payload and the dataset id of the rows (None if no
+    row matched).
+    """
+    groups = (
+        queryset
+        .values("dataset_id", *COUNT_FIELDS)
+        .annotate(
+            count=Count("id"),
+            year_sum=Sum("purchase_year"),
+            year_min=Min("purchase_year"),
+            year_max=Max("purchase_year"),
+            **{
+                f"{field}_{name}": function(field)
+                for field in PROCESS_VARIABLES
+                for name, function in (("count", Count), ("sum", Sum), ("min", Min), ("max", Max))
+            },
+            **{f"{field}_squares": Sum(F(field) * F(field)) for field in PROCESS_VARIABLES},
+        )
+        .order_by()
+    )
+    summary = DatasetSummary()
+    counts = {attr: Counter() for attr in COUNT_FIELDS.values()}
+    process = {field: RunningStats() for field in PROCESS_VARIABLES}
+    years, dataset_id = [], None
+    for group in groups:
+        dataset_id = group["dataset_id"]
+        summary.total += group["count"]
+        summary.purchase_year_sum += group["year_sum"]
+        years += [group["year_min"], group["year_max"]]
+        for field, attr in COUNT_FIELDS.items():
+            counts[attr][group[field]] += group["count"]
+        for field, stats in process.items():
+            count = group[f"{field}_count"]
+            if count:
+                mean = group[f"{field}_sum"] / count
+                m2 = max(0.0, group[f"{field}_squares"] - group[f"{field}_sum"] * mean)
+                stats.merge(RunningStats(count, mean, m2, group[f"{field}_min"], group[f"{field}_max"]))
+
+    summary.process_stats = {field: stats.to_dict() for field, stats in process.items()}
+    summary.purchase_year_min = min(years, default=None)
+    summary.purchase_year_max = max(years, default=None)
+    for attr, counter in counts.items():
+        setattr(summary, attr, dict(counter.most_common()))
+    return summary.as_dict(), dataset_id
@@ -0,0 +1,51 @@
+import io
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from ..analytics import analyze_rows, canonical_column
+from ..ingest import read_chunks
+from ..utils import analyze_csv
+from .utils import ROWS, csv_bytes
+
+LEGACY = (
+    "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+    "Pump-1,Pump,100,2,40\n"
+    "Pump-2,Pump,120,,50\n"
+    "Valve-3,Valve,80,1,30\n"
+)
+
+
+class AnalyticsTests(SimpleTestCase):
+    def analyze(self, data):
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as file:
+            file.write(data)
+        self.addCleanup(os.remove, file.name)
+        return analyze_csv(file.name)
+
+    def test_upload_layout(self):
+        summary = self.analyze(csv_bytes(*ROWS))
+        self.assertEqual(summary["total_count"], 4)
+        self.assertAlmostEqual(summary["avg_pressure"], 3.75)
+        self.assertEqual(summary["type_distribution"], {"Pump": 2, "Valve": 1, "Reactor": 1})
+
+    def test_legacy_headers(self):
+        summary = self.analyze(LEGACY.encode())
+        self.assertEqual(summary["total_count"], 3)
+        self.assertEqual(summary["avg_flowrate"], 100)
+        self.assertEqual(summary["avg_pressure"], 1.5)
+        self.assertEqual(summary["type_distribution"], {"Pump": 2, "Valve": 1})
+
+    def test_headers_match_ingest(self):
+        self.assertEqual(
+            [canonical_column(header) for header in ("TYPE", "EQUIPMENT NAME", "PRESSURE (BAR)", "equipment_type")],
+            ["type", "name", "pressure", "type"],
+        )
+        stats = analyze_rows([{"TYPE": "Pump", "FLOWRATE (L/MIN)": "5"}, {"TYPE": "Valve", "FLOWRATE (L/MIN)": ""}])
+        self.assertEqual(dict(stats.categories["type"]), {"Pump": 1, "Valve": 1})
+        self.assertEqual((stats.numeric["flowrate"].count, stats.numeric["flowrate"].mean), (1, 5))
+
+        data = "equipment_id,EQUIPMENT NAME,TYPE,purchase_year\n1,Pump-1,Pump,2015\n".encode()
+        chunk = next(read_chunks(io.BytesIO(data), 10, "upload.csv"))
+        self.assertEqual(list(chunk.columns), ["equipment_id", "equipment_name", "equipment_type", "purchase_year"])
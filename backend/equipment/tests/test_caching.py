@@ -0,0 +1,42 @@
+from django.core.cache import cache
+
+from ..caching import DATA_VERSION_KEY, bump_data_version, get_data_version
+from .utils import ROWS, EquipmentTestCase
+
+
+class ResponseCacheTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingest(*ROWS)
+
+    def test_cache_hit_reads_nothing(self):
+        first = self.client.get("/api/summary/?type=Pump")
+        with self.assertNumQueries(0):
+            again = self.client.get("/api/summary/?type=Pump")
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(again["ETag"], first["ETag"])
+        self.assertIn("no-cache", again["Cache-Control"])
+        self.assertIn("Accept", again["Vary"])
+
+    def test_conditional_get(self):
+        response = self.client.get("/api/summary/")
+        etag = response["ETag"]
+        self.assertEqual(self.client.get("/api/summary/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(
+            self.client.get("/api/summary/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]).status_code, 304
+        )
+
+    def test_new_upload_changes_the_response(self):
+        etag = self.client.get("/api/summary/")["ETag"]
+        self.ingest(*ROWS[:2])
+        response = self.client.get("/api/summary/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total_equipment"], 2)
+
+    def test_data_version_only_grows(self):
+        version = get_data_version()
+        bumped = bump_data_version()
+        self.assertGreater(bumped, version)
+        # A lost version restarts from the clock, not below the last one
+        cache.delete(DATA_VERSION_KEY)
+        self.assertGreaterEqual(get_data_version(), bumped)
@@ -0,0 +1,58 @@
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from django.test import override_settings
+
+from ..charts import Figure, cached_chart, charts_dir, density_chart, type_chart
+from ..models import Dataset
+from ..reports import delete_reports, report_charts, report_key, report_name
+from .utils import ROWS, EquipmentTestCase
+
+
+@unittest.skipIf(Figure is None, "matplotlib is not installed")
+class ReportChartTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingest(*ROWS)
+        self.dataset = Dataset.objects.select_related("summary").get()
+        self.summary = self.dataset.summary.as_dict()
+
+    def test_charts_are_rendered_once(self):
+        with mock.patch("equipment.reports.type_chart", wraps=type_chart) as render:
+            paths = report_charts(self.dataset, self.summary)
+            self.assertEqual(report_charts(self.dataset, self.summary), paths)
+        render.assert_called_once()
+        self.assertEqual(
+            [os.path.basename(path) for path in paths],
+            [f"{report_key(self.dataset)}-types.png", f"{report_key(self.dataset)}-density.png"],
+        )
+        for path in paths:
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_filtered_charts_are_kept_apart(self):
+        paths = report_charts(self.dataset, self.summary)
+        filtered = report_charts(self.dataset, self.summary, {"type": ["Pump"]})
+        self.assertEqual(len(filtered), 2)
+        self.assertFalse(set(paths) & set(filtered))
+        # Charts of older versions go with their reports
+        delete_reports(self.dataset.pk)
+        self.assertFalse(any(map(os.path.exists, paths + filtered)))
+
+    def test_report_name_follows_the_charts_setting(self):
+        with_charts = report_name(self.dataset)
+        with self.settings(EQUIPMENT_REPORT_CHARTS=False):
+            self.assertNotEqual(report_name(self.dataset), with_charts)
+            self.assertEqual(report_charts(self.dataset, self.summary), [])
+
+    @override_settings(EQUIPMENT_CHART_CACHE_SIZE=2)
+    def test_least_recently_used_are_evicted(self):
+        paths = [cached_chart(f"key-{i}", "types", lambda: b"png") for i in range(3)]
+        self.assertEqual(sorted(os.listdir(charts_dir())), ["key-1-types.png", "key-2-types.png"])
+        self.assertFalse(os.path.exists(paths[0]))
+
+    def test_nothing_to_draw(self):
+        self.assertIsNone(density_chart(np.array([np.nan]), np.array([np.nan])))
@@ -0,0 +1,63 @@
+import io
+import os
+import unittest
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..models import Dataset
+from ..parsing import pa
+from ..snapshots import load_snapshot, snapshot_path
+from .utils import ROWS, EquipmentTestCase, csv_frame
+
+
+def columnar_bytes(kind, *rows):
+    """``rows`` as they would be exported to Parquet, Feather or an Arrow stream."""
+    from pyarrow import feather, parquet
+
+    frame = csv_frame(*rows).rename(columns={"name": "equipment_name", "type": "equipment_type"})
+    frame["notes"] = "extra columns are ignored"
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = io.BytesIO()
+    if kind == "parquet":
+        parquet.write_table(table, sink, row_group_size=2)
+    elif kind == "feather":
+        feather.write_feather(table, sink, chunksize=3)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+    return sink.getvalue()
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class ColumnarUploadTests(EquipmentTestCase):
+    def upload(self, name, data):
+        file = SimpleUploadedFile(name, data, content_type="application/octet-stream")
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/upload/", {"file": file, "chunk_size": "2", "wait": "true"})
+
+    def test_formats_match_csv(self):
+        expected = ["Pump-1", "Pump-2", "Valve-3", "Reactor-4"]
+        for name, kind in [("a.parquet", "parquet"), ("b.feather", "feather"), ("c.arrow", "stream")]:
+            with self.subTest(name):
+                response = self.upload(name, columnar_bytes(kind, *ROWS))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["rows"], 4)
+                self.assertEqual(response.json()["data_preview"][0]["equipment_name"], "Pump-1")
+                self.assertEqual(list(Dataset.objects.first().equipment.order_by("equipment_id").values_list("name", flat=True)), expected)
+
+    def test_rows_are_validated(self):
+        data = columnar_bytes("parquet", ROWS[0], "2,,Pump,Active,Unit A,1850,Good,1,1,1")
+        result = self.upload("bad.parquet", data).json()
+        self.assertEqual(result["rows"], 1)
+        self.assertEqual(result["rejected"][0]["row"], 3)
+
+    def test_snapshot_is_written(self):
+        self.upload("a.parquet", columnar_bytes("parquet", *ROWS))
+        dataset = Dataset.objects.get()
+        self.assertTrue(os.path.exists(snapshot_path(dataset.pk)))
+        snapshot = load_snapshot(dataset, columns=["equipment_id", "flowrate"])
+        self.assertEqual(snapshot["equipment_id"].tolist(), [1, 2, 3, 4])
+
+        # Without the snapshot the same columns come from the database
+        os.remove(snapshot_path(dataset.pk))
+        self.assertTrue(load_snapshot(dataset, columns=["equipment_id", "flowrate"]).equals(snapshot))
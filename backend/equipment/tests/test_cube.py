@@ -0,0 +1,37 @@
+from .utils import ROWS, EquipmentTestCase
+
+
+class CubeTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingest(*ROWS, "5,Pump-5,Pump,Active,Unit A,2021,Good,,,")
+
+    def test_cells_are_column_wise(self):
+        cube = self.client.get("/api/cube/?dims=location,type&measures=count,avg:flowrate,max:purchase_year").json()
+        self.assertEqual(cube["measures"], ["count", "avg_flowrate", "max_purchase_year"])
+        self.assertEqual(cube["cells"], 4)
+        self.assertEqual(cube["columns"], {
+            "location": ["Unit A", "Unit A", "Unit B", "Unit C"],
+            "type": ["Pump", "Valve", "Pump", "Reactor"],
+            "count": [2, 1, 1, 1],
+            "avg_flowrate": [100.5, 80.0, 120.0, 200.0],
+            "max_purchase_year": [2021, 2010, 2018, 2020],
+        })
+
+    def test_filters_and_cache(self):
+        url = "/api/cube/?dims=status&type=Pump"
+        cube = self.client.get(url).json()
+        self.assertEqual(cube["columns"], {"status": ["Active", "Idle"], "count": [2, 1]})
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json(), cube)
+
+    def test_invalid_query(self):
+        for query, field in [
+            ("dims=colour", "dims"),
+            ("dims=type,type", "dims"),
+            ("dims=type&measures=median:flowrate", "measures"),
+            ("dims=type&measures=avg:name", "measures"),
+        ]:
+            response = self.client.get(f"/api/cube/?{query}")
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn(field, response.json(), query)
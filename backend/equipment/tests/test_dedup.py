@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..models import Dataset, IngestJob
+from .utils import ROWS, EquipmentTestCase, csv_bytes
+
+
+class DeduplicationTests(EquipmentTestCase):
+    def upload(self, *rows, mode="replace", wait="true"):
+        file = SimpleUploadedFile("upload.csv", csv_bytes(*rows), content_type="text/csv")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/upload/", {"file": file, "mode": mode, "wait": wait})
+        self.assertIn(response.status_code, (200, 202))
+        return response.json()
+
+    def test_repeated_upload_is_skipped(self):
+        first = self.upload(*ROWS)
+        again = self.upload(*ROWS)
+        self.assertTrue(again["deduplicated"])
+        self.assertEqual((again["dataset_id"], again["job_id"]), (first["dataset_id"], first["job_id"]))
+        self.assertEqual(again["rows"], 4)
+        self.assertEqual(again["data_preview"], first["data_preview"])
+        self.assertEqual((Dataset.objects.count(), IngestJob.objects.count()), (1, 1))
+
+    def test_matches_the_current_dataset(self):
+        self.upload(*ROWS)
+        current = self.upload(*ROWS[:2])
+        self.assertTrue(self.upload(*ROWS[:2]).get("deduplicated"))
+        # The first file is no longer the current data
+        self.assertNotIn("deduplicated", self.upload(*ROWS))
+        self.assertEqual(Dataset.objects.count(), 3)
+        self.assertNotEqual(Dataset.objects.first().pk, current["dataset_id"])
+
+    def test_matches_the_mode(self):
+        self.upload(*ROWS)
+        incremental = self.upload(*ROWS, mode="incremental")
+        self.assertNotIn("deduplicated", incremental)
+        self.assertEqual(incremental["unchanged"], 4)
+        self.assertTrue(self.upload(*ROWS, mode="incremental")["deduplicated"])
+
+    def test_upload_already_in_progress(self):
+        with mock.patch("equipment.views.submit_job"):
+            queued = self.upload(*ROWS, wait="false")
+            again = self.upload(*ROWS, wait="false")
+        self.assertEqual(again["job_id"], queued["job_id"])
+        self.assertTrue(again["deduplicated"])
+        # A client waiting for the result runs its own job
+        self.assertEqual(self.upload(*ROWS)["rows"], 4)
@@ -0,0 +1,60 @@
+import gzip
+import io
+import json
+import unittest
+
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..models import Dataset
+from ..parsing import pa
+from .utils import HEADER, ROWS, EquipmentTestCase
+
+
+class ExportTests(EquipmentTestCase):
+    def export(self, **params):
+        response = self.client.get("/api/export/", params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_csv_has_the_upload_headers(self):
+        self.ingest(*ROWS)
+        data = self.export()
+        self.assertEqual(data.decode().splitlines()[0] + "\n", HEADER)
+        self.assertEqual(pd.read_csv(io.BytesIO(data))["equipment_name"].tolist()[:2], ["Pump-1", "Pump-2"])
+
+    def test_export_can_be_uploaded_again(self):
+        self.ingest(*ROWS)
+        for format in ("csv", "parquet") if pa is not None else ("csv",):
+            with self.subTest(format):
+                data = self.export(format=format, compression="none")
+                file = SimpleUploadedFile(f"export.{format}", data)
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post("/api/upload/", {"file": file, "wait": "true"})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual((response.json()["rows"], response.json()["rejected_rows"]), (4, 0))
+                self.assertEqual(
+                    list(Dataset.objects.first().equipment.order_by("equipment_id").values_list("name", "type")),
+                    [("Pump-1", "Pump"), ("Pump-2", "Pump"), ("Valve-3", "Valve"), ("Reactor-4", "Reactor")],
+                )
+
+    def test_fields_filters_and_gzip(self):
+        self.ingest(*ROWS)
+        data = gzip.decompress(self.export(format="ndjson", compression="gzip", fields="equipment_id,type", type="Pump"))
+        self.assertEqual([json.loads(line) for line in data.splitlines()], [
+            {"equipment_id": 1, "equipment_type": "Pump"},
+            {"equipment_id": 2, "equipment_type": "Pump"},
+        ])
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquet_row_groups(self):
+        from pyarrow import parquet
+
+        self.ingest(*ROWS)
+        with self.settings(EQUIPMENT_EXPORT_CHUNK_SIZE=3):
+            table = parquet.ParquetFile(io.BytesIO(self.export(format="parquet")))
+        self.assertEqual(table.metadata.num_row_groups, 2)
+        self.assertEqual(table.schema_arrow.names[:3], ["equipment_id", "equipment_name", "equipment_type"])
+
+    def test_no_data(self):
+        self.assertEqual(self.export().decode().splitlines(), [HEADER.strip()])
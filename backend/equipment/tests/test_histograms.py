@@ -0,0 +1,40 @@
+from .utils import ROWS, EquipmentTestCase
+
+
+class HistogramTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingest(*ROWS, "5,Pump-5,Pump,Active,Unit A,2021,Good,,,")
+
+    def get(self, query):
+        response = self.client.get(f"/api/histogram/?{query}")
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_fixed_width_bins(self):
+        result = self.get("x=flowrate&width=50")
+        # The last bin includes its upper edge; rows without a flowrate are left out
+        self.assertEqual(result["edges"], [50.0, 100.0, 150.0, 200.0])
+        self.assertEqual(result["counts"], [1, 2, 1])
+        self.assertEqual(result["total"], 4)
+
+    def test_year_buckets(self):
+        result = self.get("x=purchase_year&width=5")
+        self.assertEqual(result["edges"], [2010, 2015, 2020, 2025])
+        self.assertEqual(result["counts"], [1, 2, 2])
+
+    def test_quantile_bins_and_filters(self):
+        result = self.get("x=purchase_year&method=quantile&bins=2&type=Pump")
+        self.assertEqual(result["edges"], [2015, 2018, 2021])
+        self.assertEqual(result["total"], 3)
+
+    def test_2d(self):
+        result = self.get("x=pressure&y=temperature&bins=2")
+        self.assertEqual(result["x_edges"], [1.5, 4.75, 8.0])
+        self.assertEqual(result["counts"], [[3, 0], [0, 1]])
+
+    def test_too_many_bins(self):
+        for query in ("x=flowrate&width=0.000001", "x=purchase_year&width=1&min=0&max=1000000000"):
+            response = self.client.get(f"/api/histogram/?{query}")
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn("width", response.json())
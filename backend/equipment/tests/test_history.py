@@ -0,0 +1,56 @@
+import io
+
+from ..ingest import incremental_ingest, read_chunks
+from ..models import Dataset
+from .utils import ROWS, EquipmentTestCase, csv_bytes
+
+
+class DatasetHistoryTests(EquipmentTestCase):
+    def test_uploads_are_listed_newest_first(self):
+        first = self.ingest(*ROWS)
+        second = self.ingest(*ROWS[:2])
+        history = self.client.get("/api/history/").json()
+        self.assertEqual([entry["id"] for entry in history], [second["dataset_id"], first["dataset_id"]])
+        self.assertEqual([entry["row_count"] for entry in history], [2, 4])
+        self.assertEqual(history[1]["stats"]["type_distribution"], {"Pump": 2, "Valve": 1, "Reactor": 1})
+        self.assertNotIn("preview", history[0])
+
+        detail = self.client.get(f"/api/history/{first['dataset_id']}/").json()
+        self.assertEqual([row["equipment_id"] for row in detail["preview"]], [1, 2, 3, 4])
+        # Older datasets stay readable
+        summary = self.client.get(f"/api/summary/?dataset={first['dataset_id']}").json()
+        self.assertEqual(summary["total_equipment"], 4)
+
+    def test_incremental_upload_is_a_new_version(self):
+        first = self.ingest(*ROWS)
+        changed = ROWS[1].replace("Idle", "Active")
+        second = self.ingest(ROWS[0], changed, incremental=True)
+        self.assertNotEqual(second["dataset_id"], first["dataset_id"])
+        self.assertEqual(Dataset.objects.first().pk, second["dataset_id"])
+
+        # The previous version, and its history entry, are unchanged
+        old = Dataset.objects.get(pk=first["dataset_id"])
+        self.assertEqual(old.row_count, 4)
+        self.assertEqual(old.equipment.get(equipment_id=2).status, "Idle")
+        entry = self.client.get("/api/history/").json()[1]
+        self.assertEqual(entry["stats"]["total_equipment"], 4)
+        self.assertEqual(Dataset.objects.get(pk=second["dataset_id"]).equipment.count(), 2)
+
+    def test_incremental_merge_is_chunked(self):
+        self.ingest(*ROWS)
+        upload = io.BytesIO(csv_bytes(ROWS[3], ROWS[0].replace("Good", "Fair"), ROWS[2]))
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = incremental_ingest(read_chunks(upload, 1, "upload.csv"), name="upload.csv")
+        self.assertEqual((stats["updated"], stats["unchanged"], stats["deleted"]), (1, 2, 1))
+        self.assertEqual(stats["rows"], 3)
+
+    def test_kept_rows_are_reported(self):
+        self.ingest(*ROWS)
+        typo = ROWS[2].replace("2010", "20l0")
+        stats = self.ingest(ROWS[0], ROWS[1], typo, ROWS[3], incremental=True)
+        self.assertEqual((stats["rejected_rows"], stats["deleted"]), (1, 0))
+        self.assertEqual((stats["kept"], stats["kept_ids"]), (1, [3]))
+
+        dataset = Dataset.objects.get(pk=stats["dataset_id"])
+        self.assertEqual(dataset.equipment.get(equipment_id=3).purchase_year, 2010)
+        self.assertEqual(self.client.get("/api/summary/").json()["total_equipment"], 4)
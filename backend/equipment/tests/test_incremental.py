@@ -0,0 +1,36 @@
+from ..models import Dataset
+from .utils import ROWS, EquipmentTestCase
+
+
+class IncrementalIngestTests(EquipmentTestCase):
+    def rows(self):
+        return Dataset.objects.first().equipment.order_by("equipment_id")
+
+    def test_diff_against_stored_rows(self):
+        self.ingest(*ROWS)
+        changed = ROWS[1].replace("Idle", "Active")
+        stats = self.ingest(
+            ROWS[0], changed, ROWS[3], "5,Mixer-5,Mixer,Active,Unit D,2021,Good,90.0,1.0,25.0",
+            incremental=True,
+        )
+        self.assertEqual(
+            (stats["inserted"], stats["updated"], stats["deleted"], stats["unchanged"]), (1, 1, 1, 2)
+        )
+        self.assertEqual(list(self.rows().values_list("equipment_id", flat=True)), [1, 2, 4, 5])
+        self.assertEqual(self.rows().get(equipment_id=2).status, "Active")
+
+        summary = self.client.get("/api/summary/").json()
+        self.assertEqual(summary["total_equipment"], 4)
+        self.assertEqual(summary["type_distribution"], {"Pump": 2, "Reactor": 1, "Mixer": 1})
+
+    def test_unchanged_upload(self):
+        self.ingest(*ROWS)
+        stats = self.ingest(*ROWS, incremental=True)
+        self.assertEqual(
+            (stats["inserted"], stats["updated"], stats["deleted"], stats["unchanged"]), (0, 0, 0, 4)
+        )
+
+    def test_first_upload(self):
+        stats = self.ingest(*ROWS, incremental=True)
+        self.assertEqual((stats["inserted"], stats["deleted"]), (4, 0))
+        self.assertEqual(self.rows().count(), 4)
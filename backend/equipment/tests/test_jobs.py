@@ -0,0 +1,83 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..ingest import bulk_ingest, stage_dataset
+from ..jobs import HEARTBEAT_KEY, create_job, fail_stale_jobs, run_job
+from ..models import Dataset, Equipment, IngestJob
+from .utils import ROWS, EquipmentTestCase, csv_bytes, csv_frame
+
+
+class IngestJobTests(EquipmentTestCase):
+    def upload(self, *rows, **data):
+        file = SimpleUploadedFile("upload.csv", csv_bytes(*rows), content_type="text/csv")
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post("/api/upload/", {"file": file, **data})
+
+    def test_upload_returns_job_to_poll(self):
+        with mock.patch("equipment.views.submit_job") as submit:
+            response = self.upload(*ROWS)
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertEqual(self.client.get(response.json()["status_url"]).json()["status"], "queued")
+
+        job, uploads, options = submit.call_args.args
+        with self.captureOnCommitCallbacks(execute=True):
+            run_job(job.pk, uploads, options)
+        job = self.client.get(f"/api/jobs/{job_id}/").json()
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["rows_processed"], 4)
+        self.assertEqual(job["result"]["rows"], 4)
+        self.assertEqual(self.client.get("/api/summary/").json()["total_equipment"], 4)
+
+    def test_wait_uploads_in_request(self):
+        response = self.upload(*ROWS, wait="true")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rows"], 4)
+        self.assertEqual(IngestJob.objects.get().status, IngestJob.STATUS_SUCCEEDED)
+
+    def test_invalid_options(self):
+        response = self.upload(*ROWS, chunk_size="0", wait="maybe")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"chunk_size", "wait"})
+        self.assertFalse(IngestJob.objects.exists())
+
+    def test_rows_are_unpublished_until_the_upload_finishes(self):
+        seen = []
+
+        def chunks():
+            yield csv_frame(*ROWS[:2])
+            # The first chunk is committed, but not published yet
+            seen.append((Equipment.objects.count(), Dataset.objects.count(), Dataset.all_objects.count()))
+            seen.append(self.client.get("/api/summary/").json()["total_equipment"])
+            yield csv_frame(*ROWS[2:])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_ingest(chunks(), name="upload.csv")
+        self.assertEqual(seen, [(2, 0, 1), 0])
+        self.assertEqual(self.client.get("/api/summary/").json()["total_equipment"], 4)
+
+    def test_failed_upload_deletes_staged_rows(self):
+        def chunks():
+            yield csv_frame(*ROWS[:2])
+            raise ValueError("unreadable")
+
+        with self.assertRaises(ValueError):
+            bulk_ingest(chunks(), name="upload.csv")
+        self.assertFalse(Dataset.all_objects.exists())
+        self.assertFalse(Equipment.objects.exists())
+
+    def test_lost_job_fails_and_its_rows_go(self):
+        job = create_job("upload.csv", "hash")
+        IngestJob.objects.filter(pk=job.pk).update(status=IngestJob.STATUS_RUNNING)
+        dataset = stage_dataset("upload.csv", "hash")
+        IngestJob.objects.filter(pk=job.pk).update(dataset=dataset)
+
+        fail_stale_jobs()
+        self.assertEqual(IngestJob.objects.get(pk=job.pk).status, IngestJob.STATUS_RUNNING)
+
+        cache.delete(HEARTBEAT_KEY.format(job.pk))
+        fail_stale_jobs()
+        self.assertEqual(IngestJob.objects.get(pk=job.pk).status, IngestJob.STATUS_FAILED)
+        self.assertFalse(Dataset.all_objects.exists())
@@ -0,0 +1,33 @@
+from .utils import ROWS, EquipmentTestCase
+
+
+class EquipmentListTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingest(*ROWS)
+
+    def test_keyset_pages(self):
+        page = self.client.get("/api/equipment/?limit=3&fields=name").json()
+        self.assertEqual(page["fields"], ["equipment_id", "name"])
+        self.assertEqual(page["results"], [
+            {"equipment_id": 1, "name": "Pump-1"},
+            {"equipment_id": 2, "name": "Pump-2"},
+            {"equipment_id": 3, "name": "Valve-3"},
+        ])
+        # A new upload does not move the pages of a listing already underway
+        self.ingest(*ROWS[:1])
+        last = self.client.get(page["next"]).json()
+        self.assertEqual(last["dataset_id"], page["dataset_id"])
+        self.assertEqual(last["results"], [{"equipment_id": 4, "name": "Reactor-4"}])
+        self.assertIsNone(last["next"])
+
+    def test_filters(self):
+        page = self.client.get("/api/equipment/?type=Pump,Valve&status=Active&fields=type").json()
+        self.assertEqual(page["results"], [{"equipment_id": 1, "type": "Pump"}, {"equipment_id": 3, "type": "Valve"}])
+        self.assertEqual(len(self.client.get("/api/equipment/?purchase_year_min=2018").json()["results"]), 2)
+
+    def test_invalid_query(self):
+        response = self.client.get("/api/equipment/?fields=name,cost&limit=0")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"fields", "limit"})
+        self.assertEqual(self.client.get("/api/equipment/?dataset=999").status_code, 404)
@@ -0,0 +1,36 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrateRepeatedIdsTests(TransactionTestCase):
+    """Databases from before datasets existed can repeat an equipment_id."""
+
+    before = [("equipment", "0002_remove_equipment_flowrate_remove_equipment_pressure_and_more")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        latest = MigrationExecutor(connection).loader.graph.leaf_nodes("equipment")
+        self.migrate(latest)
+
+    def test_repeated_ids_migrate(self):
+        apps = self.migrate(self.before)
+        Equipment = apps.get_model("equipment", "Equipment")
+        for name in ("Pump-1", "Pump-1b", "Valve-2"):
+            Equipment.objects.create(
+                equipment_id=2 if name.startswith("Valve") else 1, name=name, type=name.split("-")[0]
+            )
+
+        apps = self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes("equipment"))
+        Equipment = apps.get_model("equipment", "Equipment")
+        Dataset = apps.get_model("equipment", "Dataset")
+        self.assertEqual(
+            sorted(Equipment.objects.values_list("equipment_id", "name")), [(1, "Pump-1b"), (2, "Valve-2")]
+        )
+        self.assertEqual(Dataset.objects.get().row_count, 2)
+        self.assertEqual(apps.get_model("equipment", "DatasetSummary").objects.get().total, 2)
@@ -0,0 +1,76 @@
+import io
+import os
+import tempfile
+import zipfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from ..ingest import multi_file_ingest
+from ..models import Dataset
+from .utils import ROWS, EquipmentTestCase, csv_bytes
+
+SITE_B = [
+    "5,Mixer-5,Mixer,Active,Unit D,2021,Good,90.0,1.0,25.0",
+    "2,Pump-2b,Pump,Active,Unit D,2019,Good,,,",
+]
+
+
+@override_settings(EQUIPMENT_PARSE_PROCESSES=2)
+class MultiFileIngestTests(EquipmentTestCase):
+    def spool(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path, name
+
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_files_are_merged_in_upload_order(self):
+        uploads = [self.spool("a.csv", csv_bytes(*ROWS)), self.spool("b.csv", csv_bytes(*SITE_B))]
+        batches = []
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = multi_file_ingest(uploads, name="a.csv, b.csv", batch_size=2, progress=batches.append)
+
+        self.assertEqual((stats["rows"], stats["rejected_rows"]), (5, 1))
+        self.assertEqual(stats["rejected"], [
+            {"row": 3, "equipment_id": 2, "reasons": ["duplicate equipment_id"], "file": "b.csv"}
+        ])
+        self.assertEqual(
+            [(entry["file"], entry["rows"], entry["rejected_rows"]) for entry in stats["files"]],
+            [("a.csv", 4, 0), ("b.csv", 1, 1)],
+        )
+        dataset = Dataset.objects.get()
+        self.assertEqual(dataset.equipment.get(equipment_id=2).name, "Pump-2")
+        self.assertEqual(dataset.summary.total, 5)
+        # A heartbeat per written batch, not only per file
+        self.assertGreaterEqual(len(batches), 4)
+        self.assertEqual(batches[-1], 6)
+        self.assertEqual(os.listdir(self.tmp.name), ["a.csv", "b.csv"])
+
+    def test_zip_upload(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("site-a.csv", csv_bytes(*ROWS))
+            zf.writestr("nested/site-b.csv", csv_bytes(SITE_B[0]))
+            zf.writestr("__MACOSX/site-a.csv", b"junk")
+            zf.writestr("notes.txt", b"not data")
+        file = SimpleUploadedFile("sites.zip", archive.getvalue(), content_type="application/zip")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/upload/", {"file": file, "wait": "true"})
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual(result["rows"], 5)
+        self.assertEqual([entry["file"] for entry in result["files"]],
+                         ["sites.zip:site-a.csv", "sites.zip:nested/site-b.csv"])
+        self.assertEqual(self.client.get("/api/summary/").json()["total_equipment"], 5)
+
+    def test_bad_file_fails_the_upload(self):
+        uploads = [self.spool("a.csv", csv_bytes(*ROWS)), self.spool("b.csv", b"name,type\nx,y\n")]
+        with self.assertRaisesMessage(ValueError, "b.csv: CSV columns do not match"):
+            multi_file_ingest(uploads, name="a.csv, b.csv")
+        self.assertFalse(Dataset.all_objects.exists())
@@ -0,0 +1,65 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..parsing import SeenIds, clean_frame, preview_records
+from .utils import ROWS, csv_frame
+
+
+class CleanFrameTests(SimpleTestCase):
+    def test_valid_rows_are_typed(self):
+        frame, rejected = clean_frame(csv_frame(*ROWS))
+        self.assertEqual(rejected, [])
+        self.assertEqual(frame["equipment_id"].tolist(), [1, 2, 3, 4])
+        self.assertEqual(frame["purchase_year"].dtype, np.int64)
+        self.assertEqual(frame["flowrate"].tolist(), [100.5, 120.0, 80.0, 200.0])
+        self.assertEqual(frame["name"].tolist()[0], "Pump-1")
+
+    def test_rejects_bad_values_with_reasons(self):
+        frame, rejected = clean_frame(csv_frame(
+            ROWS[0],
+            "x,Pump-2,Pump,Active,Unit A,2015,Good,1,1,1",
+            "3,,Pump,Active,Unit A,2015,Good,1,1,1",
+            "4,Pump-4,Pump,Active,Unit A,20x5,Good,1,1,1",
+            "5,Pump-5,Pump,Active,Unit A,1850,Good,1,1,1",
+            "6,Pump-6,Pump,Active,Unit A,2015,Good,fast,1,1",
+        ))
+        self.assertEqual(frame["equipment_id"].tolist(), [1])
+        reasons = {entry["row"]: entry["reasons"] for entry in rejected}
+        self.assertEqual(sorted(reasons), [3, 4, 5, 6, 7])
+        self.assertEqual(reasons[3], ["equipment_id is not a number"])
+        self.assertEqual(reasons[4], ["equipment_name is empty"])
+        self.assertEqual(reasons[5], ["purchase_year is not a number"])
+        self.assertIn("purchase_year must be a whole year", reasons[6][0])
+        self.assertEqual(reasons[7], ["flowrate is not a number"])
+
+    def test_missing_optional_values(self):
+        frame, rejected = clean_frame(csv_frame("1,Pump-1,Pump,,,2015,,,,"))
+        self.assertEqual(rejected, [])
+        self.assertEqual(frame.loc[0, "status"], "Unknown")
+        self.assertTrue(frame[["flowrate", "pressure", "temperature"]].isna().all(axis=None))
+
+    def test_duplicate_ids(self):
+        seen = SeenIds()
+        clean_frame(csv_frame(ROWS[0]), seen)
+        frame, rejected = clean_frame(csv_frame(ROWS[1], ROWS[1], ROWS[0]), seen)
+        self.assertEqual(frame["equipment_id"].tolist(), [2])
+        self.assertEqual([entry["reasons"] for entry in rejected], [["duplicate equipment_id"]] * 2)
+
+    def test_preview_of_cleaned_rows(self):
+        frame, _ = clean_frame(csv_frame("x,Bad,Pump,Active,Unit A,2015,Good,1,1,1", "1,Pump-1,Pump,,,2015,,,,"))
+        self.assertEqual(preview_records(frame, 10), [{
+            "equipment_id": 1, "equipment_name": "Pump-1", "equipment_type": "Pump", "status": "Unknown",
+            "location": "Unknown", "purchase_year": 2015, "condition": "Unknown",
+            "flowrate": None, "pressure": None, "temperature": None,
+        }])
+
+
+class SeenIdsTests(SimpleTestCase):
+    def test_added_ids_stay_sorted(self):
+        seen = SeenIds([5, 1])
+        for chunk in ([9, 3], [2], [10, 4, 7]):
+            self.assertFalse(seen.contains(chunk).any())
+            seen.add(chunk)
+        self.assertEqual(seen.ids.tolist(), [1, 2, 3, 4, 5, 7, 9, 10])
+        self.assertEqual(seen.contains([0, 4, 8, 10, 11]).tolist(), [False, True, False, True, False])
+        self.assertFalse(SeenIds().contains([1]).any())
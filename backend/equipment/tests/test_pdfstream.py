@@ -0,0 +1,74 @@
+import re
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ..pdfstream import ChunkBuffer, StreamingCanvas
+from ..reports import ReportLayout
+from .utils import ROWS, EquipmentTestCase
+
+
+class StreamingCanvasTests(SimpleTestCase):
+    def render(self, pages):
+        buffer = ChunkBuffer()
+        canvas = StreamingCanvas(buffer, title="Test (report)")
+        chunks = []
+        for page in range(pages):
+            canvas.setFont("Helvetica-Bold", 12)
+            canvas.drawString(50, 800, f"Page {page + 1} (of {pages})")
+            canvas.rect(50, 50, 100, 20, fill=1)
+            canvas.showPage()
+            chunks.append(buffer.drain())
+        canvas.save()
+        chunks.append(buffer.drain())
+        return chunks
+
+    def test_pages_are_written_as_they_finish(self):
+        chunks = self.render(3)
+        self.assertTrue(chunks[0].startswith(b"%PDF-1.4"))
+        self.assertTrue(all(b"/Type /Page " in chunk for chunk in chunks[:3]))
+        self.assertNotIn(b"xref", b"".join(chunks[:3]))
+
+    def test_cross_reference_table(self):
+        pdf = b"".join(self.render(3))
+        self.assertTrue(pdf.endswith(b"%%EOF\n"))
+        self.assertIn(b"/Type /Pages /Kids [", pdf)
+        self.assertIn(b"/Count 3", pdf)
+        self.assertIn(rb"/Title (Test \(report\))", pdf)
+
+        xref_offset = int(re.search(rb"startxref\n(\d+)\n", pdf).group(1))
+        self.assertTrue(pdf[xref_offset:].startswith(b"xref\n0 "))
+        entries = re.findall(rb"(\d{10}) 00000 n \n", pdf[xref_offset:])
+        for object_id, offset in enumerate(entries, start=1):
+            self.assertTrue(pdf[int(offset):].startswith(f"{object_id} 0 obj\n".encode()), object_id)
+
+
+@override_settings(EQUIPMENT_REPORT_CHARTS=False)
+class FullReportTests(EquipmentTestCase):
+    def download(self, query):
+        # Page contents are compressed: record the table rows as they are drawn
+        with mock.patch.object(ReportLayout, "table_row", autospec=True, side_effect=ReportLayout.table_row) as rows:
+            response = self.client.get(f"/api/report/pdf/?mode=full&{query}")
+            chunks = list(response.streaming_content)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        return chunks, [call.args[1] for call in rows.call_args_list]
+
+    def test_every_row_is_listed(self):
+        self.ingest(*(f"{i},Pump-{i},Pump,Active,Unit A,2015,Good,1,1,1" for i in range(1, 301)))
+        with self.settings(EQUIPMENT_REPORT_CHUNK_SIZE=50):
+            chunks, rows = self.download("")
+        pdf = b"".join(chunks)
+        self.assertTrue(pdf.endswith(b"%%EOF\n"))
+        self.assertEqual([row[0] for row in rows], [str(i) for i in range(1, 301)])
+        # Pages go out as they are drawn
+        pages = pdf.count(b"/Type /Page ")
+        self.assertGreater(pages, 3)
+        self.assertEqual(len(chunks), pages + 1)
+
+    def test_filtered_rows(self):
+        self.ingest(*ROWS)
+        _, rows = self.download("type=Valve,Reactor")
+        self.assertEqual([row[1] for row in rows], ["Valve-3", "Reactor-4"])
+
+    def test_invalid_mode(self):
+        self.assertEqual(self.client.get("/api/report/pdf/?mode=detailed").status_code, 400)
@@ -0,0 +1,45 @@
+import io
+
+from ..ingest import bulk_ingest, read_chunks
+from ..models import Dataset
+from .utils import ROWS, EquipmentTestCase
+
+ALIASED = (
+    "equipment_id,equipment_name,equipment_type,status,location,purchase_year,condition,"
+    "FLOWRATE (L/MIN),PRESSURE (BAR),TEMPERATURE (°C)\n"
+    "1,Pump-1,Pump,Active,Unit A,2015,Good,100,2,40\n"
+    "2,Pump-2,Pump,Active,Unit A,2016,Good,,4,\n"
+)
+
+
+class ProcessVariableTests(EquipmentTestCase):
+    def test_stored_with_missing_values(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_ingest(read_chunks(io.BytesIO(ALIASED.encode()), 100, "upload.csv"), name="upload.csv")
+        rows = Dataset.objects.get().equipment.order_by("equipment_id")
+        self.assertEqual(
+            list(rows.values_list("flowrate", "pressure", "temperature")), [(100, 2, 40), (None, 4, None)]
+        )
+        summary = self.client.get("/api/summary/").json()
+        self.assertEqual((summary["avg_flowrate"], summary["std_flowrate"]), (100, None))
+        self.assertEqual((summary["min_pressure"], summary["max_pressure"]), (2, 4))
+        self.assertEqual(summary["avg_pressure"], 3)
+
+    def test_summary_statistics(self):
+        self.ingest(*ROWS)
+        summary = self.client.get("/api/summary/").json()
+        self.assertEqual(summary["avg_flowrate"], 125.12)
+        self.assertEqual(summary["std_flowrate"], 52.52)
+        self.assertEqual((summary["min_temperature"], summary["max_temperature"]), (30, 150))
+
+        # Filtered summaries aggregate the stored columns in the database
+        pumps = self.client.get("/api/summary/?type=Pump").json()
+        self.assertEqual(pumps["avg_pressure"], 2.75)
+        self.assertEqual(pumps["std_pressure"], 0.35)
+        self.assertEqual((pumps["min_flowrate"], pumps["max_flowrate"]), (100.5, 120))
+
+    def test_no_values(self):
+        self.ingest("1,Pump-1,Pump,Active,Unit A,2015,Good,,,")
+        summary = self.client.get("/api/summary/").json()
+        self.assertIsNone(summary["avg_flowrate"])
+        self.assertIsNone(summary["std_temperature"])
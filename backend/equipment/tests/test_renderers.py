@@ -0,0 +1,61 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ..parsing import pa
+from ..renderers import ARROW_METADATA_KEY, ORJSONRenderer, arrow_table, msgpack, orjson
+from .utils import ROWS, EquipmentTestCase
+
+
+@unittest.skipIf(orjson is None, "orjson is not installed")
+class ORJSONRendererTests(SimpleTestCase):
+    def test_numpy_values(self):
+        data = {"counts": np.array([1, 2]), "mean": np.float64(2.5), "missing": pd.NA, 3: "key"}
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), {
+            "counts": [1, 2], "mean": 2.5, "missing": None, "3": "key",
+        })
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class ArrowTableTests(SimpleTestCase):
+    def test_cube_columns(self):
+        table = arrow_table({"dataset_id": 1, "cells": 2, "columns": {"type": ["Pump", "Valve"], "count": [2, 1]}})
+        self.assertEqual(table.to_pydict(), {"type": ["Pump", "Valve"], "count": [2, 1]})
+        self.assertEqual(json.loads(table.schema.metadata[ARROW_METADATA_KEY]), {"dataset_id": 1, "cells": 2})
+
+    def test_other_dicts_are_one_row(self):
+        table = arrow_table({"total": 4, "counts": np.array([[1, 0], [0, 3]])})
+        self.assertEqual(table.to_pylist(), [{"total": 4, "counts": [[1, 0], [0, 3]]}])
+
+
+class NegotiationTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingest(*ROWS)
+
+    def test_json_by_default(self):
+        response = self.client.get("/api/histogram/?x=flowrate&width=50")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json()["counts"], [1, 2, 1])
+
+    @unittest.skipIf(msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        response = self.client.get("/api/summary/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        summary = msgpack.unpackb(response.content)
+        self.assertEqual(summary, self.client.get("/api/summary/").json())
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_arrow_stream(self):
+        response = self.client.get("/api/cube/?dims=type", HTTP_ACCEPT="application/vnd.apache.arrow.stream")
+        self.assertEqual(response["Content-Type"], "application/vnd.apache.arrow.stream")
+        table = pa.ipc.open_stream(response.content).read_all()
+        self.assertEqual(table.to_pydict(), {"type": ["Pump", "Reactor", "Valve"], "count": [2, 1, 1]})
+        # Each media type is cached on its own
+        self.assertEqual(self.client.get("/api/cube/?dims=type").json()["columns"]["count"], [2, 1, 1])
+
+    def test_unsupported_media_type(self):
+        self.assertEqual(self.client.get("/api/summary/", HTTP_ACCEPT="application/xml").status_code, 406)
@@ -0,0 +1,51 @@
+import os
+from unittest import mock
+
+from django.test import override_settings
+
+from ..models import Dataset
+from ..reports import draw_report, report_path
+from .utils import ROWS, EquipmentTestCase
+
+
+@override_settings(EQUIPMENT_REPORT_CHARTS=False)
+class ReportCacheTests(EquipmentTestCase):
+    def download(self, **headers):
+        response = self.client.get("/api/report/pdf/", **headers)
+        body = b"".join(response.streaming_content) if response.status_code == 200 else b""
+        response.close()
+        return response, body
+
+    def test_rendered_once_per_version(self):
+        self.ingest(*ROWS)
+        with mock.patch("equipment.reports.draw_report", wraps=draw_report) as draw:
+            first, pdf = self.download()
+            _, again = self.download()
+        self.assertEqual(draw.call_count, 1)
+        self.assertTrue(pdf.startswith(b"%PDF"))
+        self.assertEqual(again, pdf)
+        self.assertEqual(self.download(HTTP_IF_NONE_MATCH=first["ETag"])[0].status_code, 304)
+
+    def test_new_upload_renders_a_new_report(self):
+        self.ingest(*ROWS)
+        etag = self.download()[0]["ETag"]
+        old = report_path(Dataset.objects.get())
+        self.ingest(*ROWS[:2], incremental=True)
+        response, _ = self.download(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertTrue(os.path.exists(report_path(Dataset.objects.first())))
+        self.assertTrue(os.path.exists(old))
+
+    @override_settings(EQUIPMENT_PRERENDER_REPORTS=True)
+    def test_prerendered_at_ingest(self):
+        self.ingest(*ROWS)
+        path = report_path(Dataset.objects.get())
+        self.assertTrue(os.path.exists(path))
+        with mock.patch("equipment.reports.draw_report") as draw:
+            self.assertEqual(self.download()[0].status_code, 200)
+        draw.assert_not_called()
+
+    def test_nothing_uploaded(self):
+        self.assertEqual(self.download()[0].status_code, 200)
+        self.assertTrue(os.path.exists(report_path(None)))
@@ -0,0 +1,56 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..sketches import RANK_ERROR, KLLSketch
+from .utils import ROWS, EquipmentTestCase
+
+
+class KLLSketchTests(SimpleTestCase):
+    def sketch(self, values, seed=0):
+        sketch = KLLSketch()
+        sketch._rng = np.random.default_rng(seed)
+        for chunk in np.array_split(values, 20):
+            sketch.update(chunk)
+        return sketch
+
+    def assertRankWithin(self, values, value, fraction):
+        rank = np.searchsorted(np.sort(values), value) / len(values)
+        self.assertLessEqual(abs(rank - fraction), RANK_ERROR)
+
+    def test_quantiles_within_rank_error(self):
+        values = np.random.default_rng(1).lognormal(size=100_000)
+        sketch = self.sketch(values)
+        self.assertEqual(sketch.n, len(values))
+        self.assertLess(sum(len(items) for items in sketch.levels), 2000)
+        for fraction in (0.1, 0.5, 0.95, 0.99):
+            self.assertRankWithin(values, sketch.quantile(fraction), fraction)
+        self.assertEqual(sketch.quantile(0), values.min())
+        self.assertEqual(sketch.quantile(1), values.max())
+
+    def test_merge(self):
+        values = np.random.default_rng(2).normal(size=50_000)
+        merged = self.sketch(values[:20_000], seed=3)
+        merged.merge(self.sketch(values[20_000:], seed=4))
+        self.assertEqual(merged.n, len(values))
+        for fraction in (0.25, 0.5, 0.75):
+            self.assertRankWithin(values, merged.quantile(fraction), fraction)
+
+    def test_round_trip_and_empty(self):
+        sketch = self.sketch(np.arange(1000.0))
+        restored = KLLSketch.from_dict(sketch.to_dict())
+        self.assertEqual(restored.quantiles([0.5, 0.9]), sketch.quantiles([0.5, 0.9]))
+        empty = KLLSketch()
+        empty.update([np.nan])
+        self.assertEqual(empty.n, 0)
+        self.assertIsNone(empty.quantile(0.5))
+
+
+
+class SummaryPercentileTests(EquipmentTestCase):
+    def test_percentiles_in_summary(self):
+        self.ingest(*ROWS, "5,Pump-5,Pump,Active,Unit A,2021,Good,,,")
+        summary = self.client.get("/api/summary/").json()
+        self.assertEqual(summary["percentiles"]["purchase_year"], {"p50": 2018.0, "p95": 2021.0, "p99": 2021.0})
+        self.assertEqual(summary["percentiles"]["flowrate"]["p50"], 100.5)
+        self.assertEqual(summary["percentiles_by_type"]["Pump"]["purchase_year"]["p50"], 2018.0)
+        self.assertEqual(summary["percentile_rank_error"], RANK_ERROR)
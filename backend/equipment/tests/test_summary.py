@@ -0,0 +1,20 @@
+from .utils import ROWS, EquipmentTestCase
+
+
+class SummaryQueryTests(EquipmentTestCase):
+    def setUp(self):
+        super().setUp()
+        self.ingest(*ROWS)
+
+    def test_summary_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/summary/")
+        self.assertEqual(response.json()["total_equipment"], 4)
+
+    def test_filtered_summary_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/summary/?type=Pump&status=Active&purchase_year_min=2010")
+        summary = response.json()
+        self.assertEqual(summary["total_equipment"], 1)
+        self.assertEqual(summary["type_distribution"], {"Pump": 1})
+        self.assertEqual(summary["avg_purchase_year"], 2015)
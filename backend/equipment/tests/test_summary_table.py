@@ -0,0 +1,50 @@
+from ..ingest import bulk_ingest
+from ..models import Dataset
+from ..summary import aggregate_summary
+from .utils import ROWS, EquipmentTestCase, csv_frame
+
+# Quantile sketches are only kept in the summary table
+SKETCHED = ("percentiles", "percentiles_by_type")
+
+
+class SummaryTableTests(EquipmentTestCase):
+    def assertMatchesRows(self, dataset):
+        stored = dataset.summary.as_dict()
+        aggregated, _ = aggregate_summary(dataset.equipment.all())
+        for key in SKETCHED:
+            stored.pop(key), aggregated.pop(key)
+        self.assertEqual(stored, aggregated)
+
+    def test_built_chunk_by_chunk(self):
+        chunks = [
+            csv_frame(*ROWS[:2]),
+            csv_frame("3,Valve-3,Valve,Active,Unit A,2010,Good,,,", "x,Bad,Pump,Active,Unit A,2015,Good,1,1,1"),
+            csv_frame(ROWS[3], ROWS[0]),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_ingest(iter(chunks), name="upload.csv")
+        dataset = Dataset.objects.get()
+        self.assertEqual(dataset.summary.total, 4)
+        self.assertEqual(dataset.summary.type_counts, {"Pump": 2, "Valve": 1, "Reactor": 1})
+        self.assertEqual(dataset.summary.process_stats["flowrate"]["count"], 3)
+        self.assertMatchesRows(dataset)
+
+    def test_incremental_version(self):
+        self.ingest(*ROWS)
+        self.ingest(
+            ROWS[0],
+            "2,Pump-2,Pump,Active,Unit B,2018,Good,130.0,3.0,45.5",
+            ROWS[3],
+            "5,Mixer-5,Mixer,Active,Unit D,2021,Good,90.0,1.0,25.0",
+            incremental=True,
+        )
+        dataset = Dataset.objects.first()
+        self.assertEqual(dataset.summary.total, 4)
+        self.assertEqual(dataset.summary.status_counts, {"Active": 3, "Maintenance": 1})
+        self.assertMatchesRows(dataset)
+
+    def test_summary_reads_no_rows(self):
+        self.ingest(*ROWS)
+        with self.assertNumQueries(1) as queries:
+            self.assertEqual(self.client.get("/api/summary/").json()["type_distribution"]["Pump"], 2)
+        self.assertNotIn("equipment_equipment", queries.captured_queries[0]["sql"])
@@ -0,0 +1,54 @@
+"""Fixtures shared by the equipment tests."""
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..ingest import bulk_ingest, incremental_ingest, read_chunks
+
+HEADER = (
+    "equipment_id,equipment_name,equipment_type,status,location,"
+    "purchase_year,condition,flowrate,pressure,temperature\n"
+)
+
+ROWS = [
+    "1,Pump-1,Pump,Active,Unit A,2015,Good,100.5,2.5,40.0",
+    "2,Pump-2,Pump,Idle,Unit B,2018,Fair,120.0,3.0,45.5",
+    "3,Valve-3,Valve,Active,Unit A,2010,Good,80.0,1.5,30.0",
+    "4,Reactor-4,Reactor,Maintenance,Unit C,2020,Excellent,200.0,8.0,150.0",
+]
+
+
+def csv_bytes(*rows):
+    return (HEADER + "\n".join(rows) + "\n").encode()
+
+
+def csv_frame(*rows):
+    """A chunk as read_chunks parses it from CSV lines."""
+    return next(read_chunks(io.BytesIO(csv_bytes(*rows)), 1000, "upload.csv"))
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(prefix="equipment-tests-"),
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    EQUIPMENT_PRERENDER_REPORTS=False,
+)
+class EquipmentTestCase(TestCase):
+    """Runs with a temporary MEDIA_ROOT and a local-memory response cache."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def ingest(self, *rows, incremental=False):
+        ingest = incremental_ingest if incremental else bulk_ingest
+        # Snapshots are moved into place and the data version bumped on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            return ingest(csv_frame(*rows), name="upload.csv")
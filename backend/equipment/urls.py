@@ -1,8 +1,18 @@
 from django.urls import path
-from .views import upload_csv, summary_view, pdf_report_view
+from .views import (
+    upload_csv, job_detail_view, summary_view, cube_view, histogram_view, equipment_list_view,
+    export_view, history_view, dataset_detail_view, pdf_report_view,
+)
 
 urlpatterns = [
     path('upload/', upload_csv, name='upload_csv'),
+    path('jobs/<uuid:job_id>/', job_detail_view, name='job_detail'),
     path('summary/', summary_view, name='summary'),
+    path('cube/', cube_view, name='cube'),
+    path('histogram/', histogram_view, name='histogram'),
+    path('equipment/', equipment_list_view, name='equipment_list'),
+    path('export/', export_view, name='export'),
+    path('history/', history_view, name='history'),
+    path('history/<int:dataset_id>/', dataset_detail_view, name='dataset_detail'),
     path("report/pdf/", pdf_report_view, name="pdf_report"),
 ]
@@ -1,14 +1,18 @@
-import pandas as pd
+from .analytics import analyze_file
+
 
 def analyze_csv(file_path):
-    df = pd.read_csv(file_path)
+    """Totals, process-variable averages and type counts of a CSV file, in one streaming pass."""
+    stats = analyze_file(file_path, numeric=("flowrate", "pressure", "temperature"), categories=("type",))
+    numeric = stats.numeric
 
     summary = {
-        "total_count": len(df),
-        "avg_flowrate": df["Flowrate"].mean(),
-        "avg_pressure": df["Pressure"].mean(),
-        "avg_temperature": df["Temperature"].mean(),
-        "type_distribution": df["Type"].value_counts().to_dict()
+        "total_count": stats.rows,
+        "avg_flowrate": numeric["flowrate"].mean if numeric["flowrate"].count else None,
+        "avg_pressure": numeric["pressure"].mean if numeric["pressure"].count else None,
+        "avg_temperature": numeric["temperature"].mean if numeric["temperature"].count else None,
+        "type_distribution": dict(stats.categories["type"].most_common())
     }
 
     return summary
+
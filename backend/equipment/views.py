@@ -1,131 +1,382 @@
-from rest_framework.decorators import api_view, permission_classes
+import pandas as pd
+
+from rest_framework.decorators import (
+    api_view, authentication_classes, content_negotiation_class, permission_classes, renderer_classes
+)
+from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from django.http import JsonResponse, HttpResponse
-from django.db.models import Avg, Count
-import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
-from .models import Equipment
+from .caching import cached_response
+from .cube import build_cube
+from .export import FORMATS as EXPORT_FORMATS, iter_export
+from .jobs import (
+    create_job, discard_uploads, duplicate_result, fail_stale_jobs, find_duplicate, find_running_duplicate,
+    is_multi_file, run_job, spool_uploads, submit_job,
+)
+from .filters import dataset_rows, filter_columns, filter_equipment, filter_frame
+from .histograms import HISTOGRAM_FIELDS, field_values, histogram, histogram_2d
+from .models import Dataset, Equipment, IngestJob
+from .parsing import MODEL_FIELDS, UPLOAD_EXTENSIONS
+from .renderers import data_renderers
+from .reports import get_report, iter_full_report, report_etag
+from .serializers import (
+    DatasetDetailSerializer,
+    CubeQuerySerializer,
+    DatasetSerializer,
+    EquipmentFilterSerializer,
+    EquipmentListQuerySerializer,
+    ExportQuerySerializer,
+    HistogramQuerySerializer,
+    IngestJobSerializer,
+    UploadOptionsSerializer,
+)
+from .snapshots import load_snapshot
+from .summary import aggregate_summary, empty_summary
 
 
-# CSV Upload API
+# CSV Upload API (one or more CSV/Parquet/Feather files, or ZIP archives of them)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def upload_csv(request):
-    if 'file' not in request.FILES:
+    files = request.FILES.getlist('file')
+    if not files:
         return Response({"error": "No file uploaded"}, status=400)
 
-    file = request.FILES['file']
-
-    if not file.name.endswith('.csv'):
-        return Response({"error": "Only CSV files are allowed"}, status=400)
-
-    try:
-        df = pd.read_csv(file)
-
-        required_columns = [
-            "equipment_id",
-            "equipment_name",
-            "equipment_type",
-            "status",
-            "location",
-            "purchase_year",
-            "condition"
-        ]
-
-        if not all(col in df.columns for col in required_columns):
-            return Response(
-                {"error": "CSV columns do not match required format"},
-                status=400
-            )
-
-        # Clear old data to avoid duplicates
-        Equipment.objects.all().delete()
-
-        # Save data
-        for _, row in df.iterrows():
-            Equipment.objects.create(
-                equipment_id=int(row["equipment_id"]),
-                name=str(row["equipment_name"]),
-                type=str(row["equipment_type"]),
-                status=str(row["status"]),
-                location=str(row["location"]),
-                purchase_year=int(row["purchase_year"]),
-                condition=str(row["condition"])
-            )
-
-        # Return first 10 rows for frontend preview
-        data_preview = df.head(10).to_dict(orient="records")
+    if not all(file.name.lower().endswith(UPLOAD_EXTENSIONS + ('.zip',)) for file in files):
+        return Response(
+            {"error": "Only CSV, Parquet or Feather files (or ZIP archives of them) are allowed"},
+            status=400
+        )
+
+    mode = request.data.get("mode", "replace")
+    if mode not in ("replace", "incremental"):
+        return Response({"error": "mode must be 'replace' or 'incremental'"}, status=400)
 
+    query = UploadOptionsSerializer(data=request.data)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+    options = {"chunk_size": params.get("chunk_size"), "batch_size": params.get("batch_size")}
+    uploads, content_hash = spool_uploads(files)
+
+    if mode == "incremental" and is_multi_file(uploads):
+        discard_uploads(uploads)
+        return Response({"error": "Incremental uploads take a single CSV file"}, status=400)
+
+    # Same bytes as the current data: skip parsing and writing entirely
+    dataset = find_duplicate(content_hash, mode)
+    if dataset is not None:
+        discard_uploads(uploads)
+        return Response(duplicate_result(dataset))
+
+    # Same bytes already being ingested: hand back that job (unless the
+    # client waits for a result, which it then gets from its own job)
+    running = None if params["wait"] else find_running_duplicate(content_hash, mode)
+    if running is not None:
+        discard_uploads(uploads)
         return Response({
-            "message": "File uploaded successfully",
-            "rows": len(df),
-            "data_preview": data_preview
-        })
+            "message": "Identical upload is already being processed",
+            "deduplicated": True,
+            "job_id": str(running.pk),
+            "status": running.status,
+            "status_url": reverse("job_detail", args=[running.pk]),
+        }, status=202)
+
+    job = create_job(", ".join(file.name for file in files)[:255], content_hash, mode)
 
-    except Exception as e:
-        return Response({"error": str(e)}, status=400)
+    # wait=true keeps the old synchronous behaviour: parse and save in-request
+    if params["wait"]:
+        job = run_job(job.pk, uploads, options)
+        if job.status == IngestJob.STATUS_FAILED:
+            return Response({"error": job.errors[0], "job_id": str(job.pk)}, status=400)
+        return Response({**job.result, "job_id": str(job.pk)})
 
+    # Otherwise parse and save on the worker pool and hand back a job id
+    submit_job(job, uploads, options)
+    return Response({
+        "message": "Upload accepted for processing",
+        "job_id": str(job.pk),
+        "status": job.status,
+        "status_url": reverse("job_detail", args=[job.pk]),
+    }, status=202)
 
-# Summary API
+
+# Ingestion Job Progress API
 @api_view(['GET'])
 @permission_classes([AllowAny])
+def job_detail_view(request, job_id):
+    fail_stale_jobs()
+    job = get_object_or_404(IngestJob, pk=job_id)
+    return Response(IngestJobSerializer(job).data)
+
+
+def get_dataset_id(request):
+    """The ?dataset=<id> parameter (None means the latest upload)."""
+    dataset_id = request.query_params.get("dataset")
+    if dataset_id is not None and not dataset_id.isdigit():
+        raise Http404("Unknown dataset")
+    return dataset_id and int(dataset_id)
+
+
+def get_dataset(request):
+    """Dataset named by ?dataset=<id>, else the latest upload (None if nothing was uploaded)."""
+    datasets = Dataset.objects.select_related("summary").defer("preview", "summary__sketches")
+    dataset_id = get_dataset_id(request)
+    if dataset_id is None:
+        return datasets.first()
+    return get_object_or_404(datasets, pk=dataset_id)
+
+
+def get_filters(request):
+    """Validated row filters from the query string (400 on bad values)."""
+    serializer = EquipmentFilterSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def get_summary(dataset):
+    """Precomputed summary of ``dataset`` (an empty summary before the first upload)."""
+    if dataset is None:
+        return {**empty_summary(), "dataset_id": None}
+    return {**dataset.summary.as_dict(), "dataset_id": dataset.pk}
+
+
+def get_filtered_summary(request, filters):
+    """Summary of the rows matching ``filters``, in one grouped query."""
+    dataset_id = get_dataset_id(request)
+    rows = filter_equipment(dataset_rows(dataset_id), filters)
+    summary, found_id = aggregate_summary(rows)
+    if found_id is None and dataset_id is not None:
+        # No match: only now check that the dataset itself exists
+        get_object_or_404(Dataset, pk=dataset_id)
+    return {**summary, "dataset_id": found_id or dataset_id, "filters": filters}
+
+
+# Summary API (polled by the dashboards; served from the response cache)
+# ?status=, ?location=, ?type= (comma-separated) and ?purchase_year_min= /
+# ?purchase_year_max= narrow the rows summarised.
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@renderer_classes(data_renderers())
 def summary_view(request):
-    summary = {
-        "total_equipment": Equipment.objects.count(),
-        "avg_purchase_year": round(
-            Equipment.objects.aggregate(Avg("purchase_year"))["purchase_year__avg"] or 0, 2
-        ),
-        "type_distribution": dict(
-            Equipment.objects
-            .values("type")
-            .annotate(count=Count("type"))
-            .values_list("type", "count")
-        )
-    }
+    def render():
+        filters = get_filters(request)
+        if filters:
+            return get_filtered_summary(request, filters), None
+        dataset = get_dataset(request)
+        return get_summary(dataset), dataset.updated_at if dataset is not None else None
 
-    return JsonResponse(summary)
+    return cached_response(request, "summary", render)
 
 
-# PDF Report API
+# Equipment Listing API
+# Keyset pagination on equipment_id (?after=<last id>&limit=), the filters of
+# the summary API and ?fields= to load only some columns.
 @api_view(['GET'])
 @permission_classes([AllowAny])
-def pdf_report_view(request):
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="equipment_report.pdf"'
+def equipment_list_view(request):
+    query = EquipmentListQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+    fields = params.get("fields", MODEL_FIELDS)
+
+    dataset = get_dataset(request)
+    page = []
+    if dataset is not None:
+        rows = filter_equipment(dataset.equipment.all(), params)
+        if "after" in params:
+            rows = rows.filter(equipment_id__gt=params["after"])
+        page = list(rows.order_by("equipment_id").values(*fields)[:params["limit"] + 1])
+
+    next_url = None
+    if len(page) > params["limit"]:
+        page = page[:params["limit"]]
+        # Pin the dataset so a new upload can't shift the pages under a client
+        next_params = request.query_params.copy()
+        next_params["dataset"] = dataset.pk
+        next_params["after"] = page[-1]["equipment_id"]
+        next_url = request.build_absolute_uri(f"{request.path}?{next_params.urlencode()}")
 
-    p = canvas.Canvas(response, pagesize=A4)
-    width, height = A4
+    return Response({
+        "dataset_id": dataset.pk if dataset is not None else None,
+        "fields": fields,
+        "results": page,
+        "next": next_url,
+    })
 
-    y = height - 50
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(50, y, "Equipment Report")
 
-    p.setFont("Helvetica", 12)
-    y -= 40
+# Pivot / Cube API
+# ?dims=type,location&measures=count,avg:purchase_year plus the row filters;
+# cells come back column-wise and are cached per data version.
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@renderer_classes(data_renderers())
+def cube_view(request):
+    def render():
+        query = CubeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
 
-    total = Equipment.objects.count()
-    avg_year = Equipment.objects.aggregate(Avg('purchase_year'))['purchase_year__avg'] or 0
+        dataset = get_dataset(request)
+        rows = Equipment.objects.none()
+        if dataset is not None:
+            rows = filter_equipment(dataset.equipment.all(), params)
+        cube = build_cube(rows, params["dims"], params["measures"])
+        result = {"dataset_id": dataset.pk if dataset is not None else None, **cube}
+        return result, dataset.updated_at if dataset is not None else None
 
-    p.drawString(50, y, f"Total Equipment: {total}")
-    y -= 20
-    p.drawString(50, y, f"Average Purchase Year: {round(avg_year, 2)}")
+    return cached_response(request, "cube", render)
 
-    y -= 40
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, y, "Equipment Type Distribution")
 
-    y -= 30
-    p.setFont("Helvetica", 12)
+# Histogram API
+# ?x=<field> for a 1D histogram, plus &y=<field> for a 2D one;
+# method=fixed|quantile, bins=, width=, min=, max= and the row filters.
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+@renderer_classes(data_renderers())
+def histogram_view(request):
+    def render():
+        query = HistogramQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        options = {"method": params["method"], "bins": params["bins"], "width": params.get("width")}
+        fields = [params["x"]] + ([params["y"]] if "y" in params else [])
+
+        dataset = get_dataset(request)
+        columns = sorted({HISTOGRAM_FIELDS[field] for field in fields} | set(filter_columns(params)))
+        frame = pd.DataFrame(columns=columns)
+        if dataset is not None:
+            frame = filter_frame(load_snapshot(dataset, columns=columns), params)
+
+        x_values = field_values(frame, params["x"])
+        try:
+            if "y" in params:
+                y_values = field_values(frame, params["y"])
+                bins = histogram_2d(x_values, y_values, params["x"], params["y"], **options)
+            else:
+                bins = histogram(x_values, params["x"], lo=params.get("min"), hi=params.get("max"), **options)
+        except ValueError as e:
+            # Too many bins for the width over this data's range
+            raise ValidationError({"width": [str(e)]})
+        result = {
+            "dataset_id": dataset.pk if dataset is not None else None,
+            "x": params["x"],
+            "y": params.get("y"),
+            "method": params["method"],
+            **bins,
+        }
+        return result, dataset.updated_at if dataset is not None else None
+
+    return cached_response(request, "histogram", render)
+
+
+class ExportNegotiation(DefaultContentNegotiation):
+    """Leaves ?format= to the export view: it names a file format, not a renderer."""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+# Bulk Export API
+# ?format=csv|ndjson|parquet, ?compression=gzip, ?fields= and the row filters;
+# rows are streamed chunk by chunk as they are read.
+@api_view(['GET'])
+@content_negotiation_class(ExportNegotiation)
+@permission_classes([AllowAny])
+def export_view(request):
+    query = ExportQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+    fields = params.get("fields", MODEL_FIELDS)
+
+    dataset = get_dataset(request)
+    rows = Equipment.objects.none()
+    if dataset is not None:
+        rows = filter_equipment(dataset.equipment.all(), params)
+
+    content_type, extension = EXPORT_FORMATS[params["format"]]
+    response = StreamingHttpResponse(
+        iter_export(rows, fields, params["format"], params["compression"]), content_type=content_type
+    )
+    name = f"equipment-{dataset.pk}" if dataset is not None else "equipment"
+    response["Content-Disposition"] = f'attachment; filename="{name}.{extension}"'
+    if params["compression"] == "gzip":
+        response["Content-Encoding"] = "gzip"
+    return response
+
+
+# Upload History API
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def history_view(request):
+    limit = request.query_params.get("limit", "5")
+    limit = min(int(limit), 100) if limit.isdigit() else 5
+
+    datasets = Dataset.objects.select_related("summary").defer("preview", "summary__sketches")[:limit]
+    return Response(DatasetSerializer(datasets, many=True).data)
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def dataset_detail_view(request, dataset_id):
+    dataset = get_object_or_404(
+        Dataset.objects.select_related("summary").defer("summary__sketches"), pk=dataset_id
+    )
+    return Response(DatasetDetailSerializer(dataset).data)
+
+
+# PDF Report API
+# Rendered once per dataset version (usually right after the upload) and
+# served from MEDIA_ROOT/reports; clients can revalidate with If-None-Match.
+# ?mode=full adds a table of every equipment row (narrowed by the row
+# filters), streamed page by page as it is drawn.
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def pdf_report_view(request):
+    mode = request.query_params.get("mode", "summary")
+    if mode not in ("summary", "full"):
+        return Response({"error": "mode must be 'summary' or 'full'"}, status=400)
+    if mode == "full":
+        return full_pdf_report(request)
+
+    dataset = get_dataset(request)
+    etag = report_etag(dataset)
+    last_modified = int(dataset.updated_at.timestamp()) if dataset is not None else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(
+            open(get_report(dataset), "rb"),
+            as_attachment=True,
+            filename="equipment_report.pdf",
+            content_type="application/pdf",
+        )
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
 
-    distribution = Equipment.objects.values('type').annotate(count=Count('type'))
-    for item in distribution:
-        p.drawString(60, y, f"{item['type']}: {item['count']}")
-        y -= 20
 
-    p.showPage()
-    p.save()
+def full_pdf_report(request):
+    filters = get_filters(request)
+    dataset = get_dataset(request)
+    summary = get_filtered_summary(request, filters) if filters else get_summary(dataset)
+    rows = Equipment.objects.none()
+    if dataset is not None:
+        rows = filter_equipment(dataset.equipment.all(), filters)
 
+    response = StreamingHttpResponse(
+        iter_full_report(dataset, summary, rows, filters), content_type="application/pdf"
+    )
+    response["Content-Disposition"] = 'attachment; filename="equipment_report_full.pdf"'
     return response
@@ -1,8 +1,16 @@
 # api_client.py
 import requests
 import json
+import time
 import pandas as pd
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterator, List, Tuple
+
+try:
+    import pyarrow as pa
+except ImportError:  # tables come as JSON instead
+    pa = None
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
 
 
 class EquipmentAPIClient:
@@ -11,15 +19,18 @@ class EquipmentAPIClient:
     def __init__(self, base_url: str = "http://127.0.0.1:8000/api"):
         self.base_url = base_url
         self.session = requests.Session()
+        self._summary_etag = None
+        self._summary = None
     
     def upload_csv(self, file_path: str) -> Optional[Dict[str, Any]]:
-        """Upload CSV file to backend"""
+        """Upload CSV file to backend and wait for it to be saved"""
         try:
             with open(file_path, 'rb') as f:
                 files = {'file': (file_path.split('/')[-1], f, 'text/csv')}
                 response = self.session.post(
                     f"{self.base_url}/upload/",
-                    files=files
+                    files=files,
+                    data={'wait': 'true'}
                 )
                 response.raise_for_status()
                 return response.json()
@@ -27,12 +38,60 @@ class EquipmentAPIClient:
             print(f"Upload error: {e}")
             return None
     
-    def get_summary(self) -> Optional[Dict[str, Any]]:
-        """Get equipment summary statistics"""
+    def submit_upload(self, file_path: str, mode: str = "replace") -> Optional[Dict[str, Any]]:
+        """Submit CSV file as a background ingestion job (returns job_id)"""
+        try:
+            with open(file_path, 'rb') as f:
+                files = {'file': (file_path.split('/')[-1], f, 'text/csv')}
+                response = self.session.post(
+                    f"{self.base_url}/upload/",
+                    files=files,
+                    data={'mode': mode}
+                )
+                response.raise_for_status()
+                return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Upload error: {e}")
+            return None
+    
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get status and progress of an ingestion job"""
         try:
-            response = self.session.get(f"{self.base_url}/summary/")
+            response = self.session.get(f"{self.base_url}/jobs/{job_id}/")
             response.raise_for_status()
             return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Job status error: {e}")
+            return None
+    
+    def wait_for_job(self, job_id: str, poll_interval: float = 1.0,
+                     timeout: Optional[float] = None,
+                     on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[Dict[str, Any]]:
+        """Poll an ingestion job until it succeeds or fails"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            job = self.get_job(job_id)
+            if job is None:
+                return None
+            if on_progress:
+                on_progress(job)
+            if job['status'] in ('succeeded', 'failed'):
+                return job
+            if deadline and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+    
+    def get_summary(self) -> Optional[Dict[str, Any]]:
+        """Get equipment summary statistics (revalidated with the last ETag)"""
+        try:
+            headers = {'If-None-Match': self._summary_etag} if self._summary_etag else {}
+            response = self.session.get(f"{self.base_url}/summary/", headers=headers)
+            if response.status_code == 304:
+                return self._summary
+            response.raise_for_status()
+            self._summary = response.json()
+            self._summary_etag = response.headers.get('ETag')
+            return self._summary
         except requests.exceptions.RequestException as e:
             print(f"Summary error: {e}")
             return None
@@ -47,6 +106,130 @@ class EquipmentAPIClient:
             print(f"History error: {e}")
             return None
     
+    def _get_frame(self, path: str, params: Dict[str, Any],
+                   rows: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """GET ``path`` as a DataFrame plus the other fields of the response
+
+        With pyarrow the server is asked for an Arrow IPC stream, which is
+        read straight into a DataFrame; otherwise the ``rows`` key of the
+        JSON response is.
+        """
+        if pa is None:
+            response = self.session.get(f"{self.base_url}/{path}/", params=params)
+            response.raise_for_status()
+            data = response.json()
+            return pd.DataFrame(data.pop(rows)), data
+        response = self.session.get(
+            f"{self.base_url}/{path}/", params=params, headers={'Accept': ARROW_STREAM}
+        )
+        response.raise_for_status()
+        table = pa.ipc.open_stream(response.content).read_all()
+        metadata = (table.schema.metadata or {}).get(b'equipment', b'{}')
+        return table.to_pandas(), json.loads(metadata)
+
+    def get_cube(self, dims: List[str], measures: Optional[List[str]] = None,
+                 **filters) -> Optional[pd.DataFrame]:
+        """Get a pivot of equipment counts/measures broken down by ``dims`` as a DataFrame
+
+        ``measures`` are ``count`` or ``<avg|min|max|sum>:<numeric field>``.
+        """
+        params = {'dims': ','.join(dims), **filters}
+        if measures:
+            params['measures'] = ','.join(measures)
+        try:
+            frame, _ = self._get_frame("cube", params, 'columns')
+            return frame
+        except requests.exceptions.RequestException as e:
+            print(f"Cube error: {e}")
+            return None
+    
+    def get_histogram(self, x: str, y: Optional[str] = None, bins: int = 20,
+                      method: str = "fixed", **params) -> Optional[Dict[str, Any]]:
+        """Get bin edges and counts of a numeric field (2D when ``y`` is given)"""
+        params = {'x': x, 'bins': bins, 'method': method, **params}
+        if y:
+            params['y'] = y
+        try:
+            response = self.session.get(f"{self.base_url}/histogram/", params=params)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Histogram error: {e}")
+            return None
+    
+    def list_equipment(self, after: Optional[int] = None, limit: int = 100,
+                       fields: Optional[List[str]] = None,
+                       **filters) -> Optional[Dict[str, Any]]:
+        """Get one page of equipment rows (keyset pagination on equipment_id)
+
+        ``filters`` are passed through as query parameters (type, status,
+        location, purchase_year_min, purchase_year_max, dataset).
+        """
+        params = {'limit': limit, **filters}
+        if after is not None:
+            params['after'] = after
+        if fields:
+            params['fields'] = ','.join(fields)
+        try:
+            response = self.session.get(f"{self.base_url}/equipment/", params=params)
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            print(f"Equipment list error: {e}")
+            return None
+    
+    def iter_equipment(self, page_size: int = 1000, fields: Optional[List[str]] = None,
+                       **filters) -> Iterator[List[Dict[str, Any]]]:
+        """Yield successive pages of equipment rows until the listing is exhausted"""
+        page = self.list_equipment(limit=page_size, fields=fields, **filters)
+        while page and page['results']:
+            yield page['results']
+            if not page['next']:
+                break
+            page = self.list_equipment(
+                after=page['results'][-1]['equipment_id'], limit=page_size, fields=fields,
+                **{**filters, 'dataset': page['dataset_id']}
+            )
+
+    def iter_equipment_frames(self, page_size: int = 10000, fields: Optional[List[str]] = None,
+                              **filters) -> Iterator[pd.DataFrame]:
+        """Yield successive pages of equipment rows as DataFrames"""
+        params = {'limit': page_size, **filters}
+        if fields:
+            params['fields'] = ','.join(fields)
+        try:
+            while True:
+                frame, page = self._get_frame("equipment", params, 'results')
+                if frame.empty:
+                    break
+                yield frame
+                if not page['next']:
+                    break
+                params = {**params, 'dataset': page['dataset_id'],
+                          'after': int(frame['equipment_id'].iloc[-1])}
+        except requests.exceptions.RequestException as e:
+            print(f"Equipment list error: {e}")
+
+    def export_equipment(self, save_path: str, format: str = "csv", gzip: bool = True,
+                         **filters) -> bool:
+        """Stream every equipment row to ``save_path`` as csv, ndjson or parquet
+
+        With ``gzip`` the transfer is compressed; the file is saved decompressed.
+        """
+        params = {'format': format, **filters}
+        if gzip and format != "parquet":
+            params['compression'] = 'gzip'
+        try:
+            with self.session.get(f"{self.base_url}/export/", params=params, stream=True) as response:
+                response.raise_for_status()
+                with open(save_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        f.write(chunk)
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"Export error: {e}")
+            return False
+
     def generate_pdf(self, save_path: str) -> bool:
         """Generate and download PDF report"""
         try:
@@ -18,6 +18,16 @@ from datetime import datetime
 # Import enhanced charts
 from charts import EquipmentChart
 
+# Statistics are computed by the backend's analytics module (no Django needed;
+# installed with `pip install -e backend`), or locally when it is not installed
+try:
+    from equipment.analytics import analyze_chunks, analyze_file
+except ImportError:
+    from local_stats import analyze_chunks, analyze_file
+
+# Rows kept in memory for the preview table and charts; stats cover the whole file
+PREVIEW_ROWS = 50_000
+
 
 class StatCard(QFrame):
     """Modern stat card matching web frontend - PyQt5 optimized"""
@@ -626,6 +636,7 @@ class EquipmentVisualizer(QWidget):
         """)
         
         self.df = None
+        self.stats = None
         self.current_file = None
         
         # Main layout
@@ -703,6 +714,7 @@ class EquipmentVisualizer(QWidget):
             'condition': ['Good'] * 7 + ['Excellent'] * 3
         }
         self.df = pd.DataFrame(sample_data)
+        self.stats = analyze_chunks([self.df])
         self.current_file = "sample_equipment_data.csv"
         
         # Update UI with sample data
@@ -724,8 +736,9 @@ class EquipmentVisualizer(QWidget):
     
     def load_csv_file(self, file_path):
         try:
-            # Load CSV
-            self.df = pd.read_csv(file_path)
+            # One streaming pass for the stats, then just the rows on display
+            self.stats = analyze_file(file_path)
+            self.df = pd.read_csv(file_path, nrows=PREVIEW_ROWS)
             self.current_file = os.path.basename(file_path)
             
             # Update UI
@@ -733,7 +746,7 @@ class EquipmentVisualizer(QWidget):
             self.update_stats()
             self.chart_widget.update_chart(self.df)
             self.chart_widget.show()
-            self.preview_table.update_data(self.df, len(self.df))
+            self.preview_table.update_data(self.df, self.stats.rows)
             self.preview_table.show()
             self.export_actions.show()
             self.stats_container.show()
@@ -745,7 +758,7 @@ class EquipmentVisualizer(QWidget):
             QMessageBox.information(
                 self, "Success",
                 f"✅ CSV loaded successfully!\n\n"
-                f"Total Equipment: {len(self.df):,}\n"
+                f"Total Equipment: {self.stats.rows:,}\n"
             )
             
         except Exception as e:
@@ -753,20 +766,14 @@ class EquipmentVisualizer(QWidget):
     
     def update_stats(self):
         """Update statistics cards"""
-        if self.df is None:
+        if self.stats is None:
             return
         
         # Calculate stats
-        total_equipment = len(self.df)
-        
-        # Get column names (handle both naming conventions)
-        flow_col = 'flowrate' if 'flowrate' in self.df.columns else 'FLOWRATE (L/MIN)'
-        pressure_col = 'pressure' if 'pressure' in self.df.columns else 'PRESSURE (BAR)'
-        temp_col = 'temperature' if 'temperature' in self.df.columns else 'TEMPERATURE (°C)'
-        
-        avg_flowrate = self.df[flow_col].mean() if flow_col in self.df.columns else 125.7
-        avg_pressure = self.df[pressure_col].mean() if pressure_col in self.df.columns else 4.2
-        avg_temp = self.df[temp_col].mean() if temp_col in self.df.columns else 73.0
+        total_equipment = self.stats.rows
+        avg_flowrate = self.average("flowrate", 125.7)
+        avg_pressure = self.average("pressure", 4.2)
+        avg_temp = self.average("temperature", 73.0)
         
         # Clear existing layout
         stats_layout = self.stats_container.layout()
@@ -787,6 +794,11 @@ class EquipmentVisualizer(QWidget):
         stats_layout.addWidget(self.avg_temp_card)
         stats_layout.addStretch()
     
+    def average(self, column, default):
+        """Mean of a numeric column over the whole file (``default`` if it has no values)."""
+        stats = self.stats.numeric[column]
+        return stats.mean if stats.count else default
+    
     def download_pdf(self):
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Save PDF Report", "equipment_report.pdf", "PDF Files (*.pdf)"
@@ -800,7 +812,7 @@ class EquipmentVisualizer(QWidget):
             )
     
     def download_json(self):
-        if self.df is None:
+        if self.stats is None:
             return
         
         file_path, _ = QFileDialog.getSaveFileName(
@@ -808,19 +820,13 @@ class EquipmentVisualizer(QWidget):
         )
         
         if file_path:
-            # Get column names
-            flow_col = 'flowrate' if 'flowrate' in self.df.columns else 'FLOWRATE (L/MIN)'
-            pressure_col = 'pressure' if 'pressure' in self.df.columns else 'PRESSURE (BAR)'
-            temp_col = 'temperature' if 'temperature' in self.df.columns else 'TEMPERATURE (°C)'
-            type_col = 'equipment_type' if 'equipment_type' in self.df.columns else 'TYPE'
-            
             # Create summary
             summary = {
-                "total_equipment": len(self.df),
-                "average_flowrate": float(self.df[flow_col].mean()) if flow_col in self.df.columns else 125.7,
-                "average_pressure": float(self.df[pressure_col].mean()) if pressure_col in self.df.columns else 4.2,
-                "average_temperature": float(self.df[temp_col].mean()) if temp_col in self.df.columns else 73.0,
-                "type_distribution": self.df[type_col].value_counts().to_dict() if type_col in self.df.columns else {},
+                "total_equipment": self.stats.rows,
+                "average_flowrate": self.average("flowrate", 125.7),
+                "average_pressure": self.average("pressure", 4.2),
+                "average_temperature": self.average("temperature", 73.0),
+                "type_distribution": dict(self.stats.categories["type"].most_common()),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -0,0 +1,72 @@
+# local_stats.py
+"""Fallback for equipment.analytics when the backend package is not installed.
+
+Covers what the app reads from it: the row count, the mean of each process
+variable and the counts per equipment type, computed chunk by chunk with pandas.
+"""
+from collections import Counter
+from types import SimpleNamespace
+
+import pandas as pd
+
+# Headers of the upload layout and older exports (see backend parsing.COLUMN_ALIASES)
+HEADERS = {
+    "equipment_type": "type",
+    "Type": "type",
+    "TYPE": "type",
+    "Flowrate": "flowrate",
+    "FLOWRATE (L/MIN)": "flowrate",
+    "Pressure": "pressure",
+    "PRESSURE (BAR)": "pressure",
+    "Temperature": "temperature",
+    "TEMPERATURE (°C)": "temperature",
+}
+
+NUMERIC_COLUMNS = ("flowrate", "pressure", "temperature")
+
+
+class LocalStats:
+    """Row count, process-variable means and type counts of a stream of DataFrames."""
+
+    def __init__(self):
+        self.rows = 0
+        self.sums = dict.fromkeys(NUMERIC_COLUMNS, 0.0)
+        self.counts = dict.fromkeys(NUMERIC_COLUMNS, 0)
+        self.categories = {"type": Counter()}
+
+    @property
+    def numeric(self):
+        return {
+            column: SimpleNamespace(
+                count=self.counts[column],
+                mean=self.sums[column] / self.counts[column] if self.counts[column] else None,
+            )
+            for column in NUMERIC_COLUMNS
+        }
+
+    def update(self, frame):
+        renames = {
+            header: column for header, column in HEADERS.items()
+            if header in frame.columns and column not in frame.columns
+        }
+        frame = frame.rename(columns=renames).loc[:, lambda f: ~f.columns.duplicated()]
+        self.rows += len(frame)
+        for column in NUMERIC_COLUMNS:
+            if column in frame.columns:
+                values = pd.to_numeric(frame[column], errors="coerce").dropna()
+                self.sums[column] += float(values.sum())
+                self.counts[column] += len(values)
+        if "type" in frame.columns:
+            self.categories["type"].update(frame["type"].dropna().astype(str).value_counts().to_dict())
+        return self
+
+
+def analyze_chunks(chunks):
+    stats = LocalStats()
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def analyze_file(path, chunksize=100_000):
+    return analyze_chunks(pd.read_csv(path, chunksize=chunksize))
@@ -67,6 +67,8 @@ function App() {
 
     const formData = new FormData();
     formData.append("file", file);
+    // Ingest in the request so the summary below already covers this file
+    formData.append("wait", "true");
 
     try {
       const uploadRes = await fetch("http://127.0.0.1:8000/api/upload/", {